@@ -11,26 +11,33 @@ be installed within the python environment you are running the
 script from.
 """
 # Standard library imports
+import os
 import sys
-import psutil
+import queue
+import threading
 import multiprocessing
 from time import time as time_now
-from os.path import isdir
 from functools import partial
 
-# Third party imports
-import pytest
-from bs4 import SoupStrainer
-from requests_html import HTMLSession
-
 # Local imports
+# The scraping stack (requests-html, bs4, psutil) is imported where it is used, so modes that only move files
+# start quickly. Worker processes import it before their first search. See `pool_context`.
 from .function import os_control
 from .function import user_input
-from .function import web_control
+from .function import ranking
+from .function import scheduler
+from .function import extract
+from .function import image_control
+from .function import progress
+from .function.output_writer import OutputWriter
 from .common.colors import ColorCodes as cc
 
-# Get number of physical cores
-PROCESS = psutil.cpu_count(logical=False)
+MAX_PROCESS_FACTOR = 4  # Autotuner may run this many searches per core. Searches mostly wait on the network
+WORKER_MAX_TASKS = 50  # Replace each worker after this many searches
+WORKER_MEMORY_LIMIT = 1024 ** 3  # Replace all workers once one (including its browser) uses this many bytes
+WORKER_PRELOAD = ["reverse_image_scraper.app", "reverse_image_scraper.function.backends",
+                  "reverse_image_scraper.function.http_cache", "reverse_image_scraper.function.watchdog",
+                  "requests_html"]  # Imported by the fork server once, so forked workers start warm
 
 
 def run():
@@ -39,30 +46,74 @@ def run():
     OUTPUT_FOLDER = "output"
     INPUT_FOLDER = "input"
     DEFAULT_FOLDER = "(-) Default Results"
+    PROFILE_FOLDER = "profile"
+    HISTORY_FILE = ".link_history.jsonl"
+    NO_RESULTS_FILE = ".no_results.txt"
+    INDEX_FILE = ".extract_index.json"
+    CACHE_FOLDER = "cache"
 
     # File setup
     current_directory = os_control.get_main_dir()  # Get folder the program is in
-    current_directory = os_control.exceed_NTFS_file_limit(current_directory)  # Bypass Win 10 folder length
+    if os.name == "nt":
+        current_directory = os_control.exceed_NTFS_file_limit(current_directory)  # Bypass Win 10 folder length
     input_dir = os_control.make_dir(INPUT_FOLDER, current_directory)  # Create input folder
     output_dir = os_control.make_dir(OUTPUT_FOLDER, current_directory)  # Create output folder
     default_dir = os_control.make_dir(os_control.join_dir(OUTPUT_FOLDER,  # Create default results folder
                                                           DEFAULT_FOLDER), current_directory)
 
     # Mode choice
-    if "debug" in str(sys.argv[1:]):
+    if user_input.has_flag(sys.argv[1:], "debug"):
         test_dir = os_control.join_dir(current_directory, "reverse_image_scraper", "tests")
+        import pytest  # Only needed here
         pytest.main([test_dir])  # Run all tests
-    if "extract" in str(sys.argv[1:]):
-        extract_images(output_dir, DEFAULT_FOLDER)
+    index_path = None  # Optional record of result folders, letting `extract` skip unchanged ones
+    if user_input.has_flag(sys.argv[1:], "index"):
+        index_path = os_control.join_dir(output_dir, INDEX_FILE)
+    if user_input.has_flag(sys.argv[1:], "extract"):
+        extract_images(output_dir, DEFAULT_FOLDER, index_path)
         exit()
 
     multi_process = True
-    if "single" in str(sys.argv[1:]):
+    if user_input.has_flag(sys.argv[1:], "single"):
         multi_process = False
-    upscale_pre_process(input_dir, current_directory, default_dir, INPUT_FOLDER, OUTPUT_FOLDER, multi_process)
-
 
-def upscale_pre_process(input_dir, current_directory, default_dir, INPUT_FOLDER, OUTPUT_FOLDER, multi_process):
+    from .function import backends  # Loads the scraping stack
+    from .function import watchdog
+
+    # Search settings, given on the command line as `name=value`
+    history_path = os_control.join_dir(output_dir, HISTORY_FILE)
+    settings = {
+        "stop_after": user_input.argument_value(sys.argv[1:], "stop", 0),  # Stop once this many targets are saved
+        "target": user_input.argument_value(sys.argv[1:], "target", 0),  # Longest side a target must reach
+        "history_path": history_path,
+        "history": ranking.load_history(history_path),  # Success of each host in previous runs
+        "index_path": index_path,
+        # Searches are ordered by how likely they are to find larger copies. Images with a side of at least
+        # `skip_above` pixels aren't searched (0 searches all)
+        "skip_above": user_input.argument_value(sys.argv[1:], "skip_above", 0),
+        "no_results_path": os_control.join_dir(output_dir, NO_RESULTS_FILE),  # Images that found nothing before
+        # Larger images are shrunk before uploading. Google refuses very large uploads
+        "upload_bytes": int(user_input.argument_value(sys.argv[1:], "upload_mb", 4.0) * 1024 ** 2),
+        "upload_pixels": int(user_input.argument_value(sys.argv[1:], "upload_mp", 12.0) * 1000 ** 2),
+        # Web responses are kept between runs, so unchanged pages and images aren't downloaded again. 0 turns off
+        "cache_dir": os_control.join_dir(current_directory, CACHE_FOLDER),
+        "cache_bytes": int(user_input.argument_value(sys.argv[1:], "cache_mb", 512.0) * 1024 ** 2),
+        # Search engine. `backend=fixture fixtures=<folder>` replays recorded searches without the internet
+        "backend": backends.get_backend(user_input.argument_value(sys.argv[1:], "backend", "google"),
+                                        user_input.argument_value(sys.argv[1:], "fixtures", "")),
+        # `profile` times every search, and `profile-memory` also traces memory. Reports go in the "profile" folder
+        "profile_dir": None,
+        "profile_memory": user_input.has_flag(sys.argv[1:], "profile-memory"),
+        "run_id": watchdog.new_run_id(),  # Tags the browsers this run launches, so only they are cleaned up
+    }
+    if user_input.has_flag(sys.argv[1:], "profile") or settings["profile_memory"]:
+        settings["profile_dir"] = os_control.join_dir(current_directory, PROFILE_FOLDER)  # Not a result folder
+    upscale_pre_process(input_dir, current_directory, default_dir, INPUT_FOLDER, OUTPUT_FOLDER, multi_process,
+                        settings)
+
+
+def upscale_pre_process(input_dir, current_directory, default_dir, INPUT_FOLDER, OUTPUT_FOLDER, multi_process,
+                        settings):
     """ Set up for the actual reverse image searching process. Determines how the process is done (i.e. multi-process).
     :param input_dir: Location of user-provided image files to be uploaded.
     :param current_directory: Location of the program.
@@ -70,6 +121,7 @@ def upscale_pre_process(input_dir, current_directory, default_dir, INPUT_FOLDER,
     :param INPUT_FOLDER: Name of input folder.
     :param OUTPUT_FOLDER: Name of output folder.
     :param multi_process: Boolean. Determines if search is done with one process, or multiple
+    :param settings: Dictionary of search settings. See `run`.
     """
     files_list = os_control.list_dir(input_dir)
     if not files_list:  # Input folder is empty. Cannot progress
@@ -81,38 +133,40 @@ def upscale_pre_process(input_dir, current_directory, default_dir, INPUT_FOLDER,
 
     start_time = time_now()  # Start timer
 
-    count = 0
-    img_list = []
     ext = (".jpg", ".jpeg", ".png")
-    for filename in files_list:
-        if filename.lower().endswith(ext):  # Only search over image files
-            if multi_process:
-                img_list.append(filename)
-            else:
-                count += upscale_image(filename, default_dir, current_directory, num_links,
-                                       INPUT_FOLDER, OUTPUT_FOLDER, multi_process)
+    img_list = [filename for filename in files_list if filename.lower().endswith(ext)]  # Only search image files
+    groups = os_control.group_duplicates(input_dir, img_list)  # Files with the same contents are searched once
+    groups, skipped = scheduler.schedule(input_dir, groups, settings["skip_above"],
+                                         scheduler.load_no_results(settings["no_results_path"]))
+    if skipped:  # Left in the input folder
+        print(cc.YELLOW + "Skipping " + str(sum(1 + len(duplicates) for _, duplicates in skipped))
+              + " image(s) already " + str(settings["skip_above"]) + " pixels or larger." + cc.RESET)
+        img_list = [filename for group, duplicates in groups for filename in [group] + duplicates]
+
+    if settings["profile_dir"]:
+        from .function import profiling
+        profiling.start(settings["profile_dir"])
 
-    if multi_process:
-        # Loading bar set-up
-        files_processed = 0
-        img_list_length = len(img_list)
-        loading(img_list_length, 0)
+    count = 0
+    if not multi_process:
+        for filename, duplicates in groups:
+            count += profiled(upscale_image, settings)(filename, default_dir, current_directory, num_links,
+                                                       INPUT_FOLDER, OUTPUT_FOLDER, multi_process, settings,
+                                                       duplicates)
 
+    if multi_process:
         # Run image up-scaling in parallel
-        Pool = multiprocessing.Pool(processes=PROCESS)
-        output_location = partial(upscale_image, default_dir=default_dir, current_directory=current_directory,
+        output_location = partial(timed_upscale, default_dir=default_dir, current_directory=current_directory,
                                   num_links=num_links, INPUT_FOLDER=INPUT_FOLDER, OUTPUT_FOLDER=OUTPUT_FOLDER,
-                                  multi_process=multi_process)
-        for i in Pool.imap_unordered(output_location, img_list):
-            files_processed += i
-            loading(img_list_length, files_processed)
+                                  multi_process=multi_process, settings=settings)
+        run_parallel(output_location, groups, len(img_list), settings["run_id"])
 
         # Finish timing program
         end_time = time_now()
         seconds_elapsed = end_time - start_time
         minutes, seconds = divmod(seconds_elapsed, 60)
 
-        print(cc.YELLOW + cc.BOLD + "\nComplete!" + cc.RESET)
+        print(cc.YELLOW + cc.BOLD + "Complete!" + cc.RESET)
         print(cc.YELLOW + "Search completed in " + str(int(minutes)) + "m, " + str(int(seconds)) + "sec" + cc.RESET)
     else:
         end_time = time_now()  # Stop timer
@@ -123,8 +177,16 @@ def upscale_pre_process(input_dir, current_directory, default_dir, INPUT_FOLDER,
         print(cc.YELLOW + "Searched over " + str(count) + " images in "
               + str(int(minutes)) + "m, " + str(int(seconds)) + "sec" + cc.RESET)
 
+    if settings["profile_dir"]:  # Merge the profiles of every worker
+        for path in profiling.write_report(settings["profile_dir"]):
+            print(cc.YELLOW + "Profile written to: " + path + cc.RESET)
+
+    if settings["index_path"]:  # Let `extract` skip the new result folders until they change
+        index_results(os_control.join_dir(current_directory, OUTPUT_FOLDER), img_list, settings["index_path"])
+
 
-def upscale_image(filename, default_dir, current_directory, num_links, INPUT_FOLDER, OUTPUT_FOLDER, multi_process):
+def upscale_image(filename, default_dir, current_directory, num_links, INPUT_FOLDER, OUTPUT_FOLDER, multi_process,
+                  settings, duplicates=()):
     """ Uploads a file to google, and saves any larger images.
     :param filename: File to upload.
     :param default_dir: Where to put the original image if there are no larger images.
@@ -133,92 +195,258 @@ def upscale_image(filename, default_dir, current_directory, num_links, INPUT_FOL
     :param INPUT_FOLDER: Name of input folder.
     :param OUTPUT_FOLDER: Name of output folder.
     :param multi_process: Whether to run multi process or not.
-    :return: int 1 to track completion.
+    :param settings: Dictionary of search settings. See `run`.
+    :param duplicates: Names of input files identical to `filename`. They share its search results.
+    :return: Number of files completed, to track completion.
     """
+    from requests_html import HTMLSession
+    from .function import watchdog
+    from .function import http_cache
+
     # Set up
     path = os_control.join_dir(current_directory, INPUT_FOLDER, filename)  # Get path to image
     width, height = user_input.file_img_size(path)  # Save image details for comparison
-    session = HTMLSession()  # Start session for web browsing
-    result_url = web_control.send_image(session, path)  # Send image to google images and get URL of the results page
+    session = HTMLSession(browser_args=watchdog.browser_args(settings["run_id"]))  # Start session for web browsing
+    if settings["cache_bytes"]:
+        http_cache.install(session, settings["cache_dir"], settings["cache_bytes"])
+    try:
+        return upscale_image_with_session(session, filename, path, width, height, default_dir, current_directory,
+                                          num_links, INPUT_FOLDER, OUTPUT_FOLDER, multi_process, settings,
+                                          duplicates)
+    finally:
+        session.close()  # Also closes the browser used for rendering, which would otherwise leak
+
+
+def upscale_image_with_session(session, filename, path, width, height, default_dir, current_directory, num_links,
+                               INPUT_FOLDER, OUTPUT_FOLDER, multi_process, settings, duplicates):
+    """ Body of `upscale_image`, once a session is open.
+    :param session: HTML session to access the internet.
+    :param path: Full path to the image.
+    :param width: Width of the original image.
+    :param height: Height of the original image.
+    :return: Number of files completed, to track completion.
+    """
+    backend = settings["backend"]
+
+    progress.emit("upload")
+    upload = image_control.prepare_upload(path, settings["upload_bytes"], settings["upload_pixels"])  # None if small
+    handle = backend.upload(session, path, upload)  # Send image to search engine, and get a handle to the results
 
     # Find valid image links
-    links = []  # If result_url is None, then simply move the original file to output
-    if result_url is not None:
-        soup = web_control.get_page_from_url(session, result_url, SoupStrainer('span', {'class', 'gl'}))  # Get HTML
-        request = web_control.href_from_text(session, soup, "All sizes")  # Find relevant HREFs
-        if request is not None:
-            links = web_control.img_links_from_href(request, SoupStrainer('script'), num_links)  # Get list of URLs
+    links = []  # If handle is None, then simply move the original file to output
+    if handle is not None:
+        progress.emit("render")
+        page = backend.results(session, handle)  # Get HTML of the page listing image sizes
+        if page is not None:
+            links = backend.candidates(page, num_links * ranking.CANDIDATE_POOL)  # Get list of URLs
+            links = ranking.rank_links(links, settings["history"])[:num_links]  # Probe the best first
 
     # Loop through image results, saving relevant images
+    progress.emit("download")
     img_move_flag = False
-    index = filename.rfind(".")  # Separate name and extension
-    dir_name = filename[:index] + "(" + filename[index + 1:] + ")"  # Add file extension to name
+    outcomes = []  # (link, saved) for each probed link, to rank hosts in future runs
+    targets_saved = 0
+    dir_name = os_control.result_dir_name(filename)
+    writer = OutputWriter(os_control.join_dir(current_directory, OUTPUT_FOLDER, dir_name))  # Save new imgs here
     for link in links:  # For each link, try to save the image.
-        img, web_width, web_height, err = web_control.img_size(session, link)  # Get image with dimensions
+        img, web_width, web_height, err = backend.fetch(session, link)  # Get image with dimensions
         if img is None:  # Link did not contain an image or was otherwise invalid
             to_print(multi_process, "invalid", {"link": link})
+            outcomes.append((link, False))
             continue
 
         if web_width > width or web_height > height:  # Web image must be bigger than original to be saved
-            os_control.make_dir(os_control.join_dir(OUTPUT_FOLDER, dir_name), current_directory)  # Save new img here
             img_move_flag = True
-            title = link.split("/")[-1]  # Use end of link as new title, and save image.
-            saved_img_flag = os_control.save_image(img, os_control.join_dir(current_directory,
-                                                                            OUTPUT_FOLDER, dir_name, title))
+            title = writer.save_image(img, link.split("/")[-1])  # Use end of link as new title, and save image.
 
             if err == 403:  # Create note that larger image may exist but is blocked
-                os_control.make_note(os_control.join_dir(current_directory, OUTPUT_FOLDER, dir_name),
-                                     "Forbidden error - try manually searching.txt")
-            if not saved_img_flag:  # If cannot save image, skip
+                writer.make_note("Forbidden error - try manually searching.txt")
+            if title is None:  # If cannot save image, skip
                 to_print(multi_process, "save", {"link": link})
+                outcomes.append((link, False))
                 continue
             to_print(multi_process, "data", {"title": title, "web_width": web_width, "web_height": web_height})
+            outcomes.append((link, True))
+
+            if max(web_width, web_height) >= settings["target"]:
+                targets_saved += 1
+            if settings["stop_after"] and targets_saved >= settings["stop_after"]:  # Good enough, stop early
+                break
         else:
             to_print(multi_process, "skip", {"link": link})
+            outcomes.append((link, False))
+    ranking.record_history(settings["history_path"], outcomes)
 
     # If an image has a larger match, move original file to new folder; else remove original from search
-    if img_move_flag:
-        source = os_control.join_dir(current_directory, INPUT_FOLDER) + "\\"
-        destination = os_control.join_dir(current_directory, OUTPUT_FOLDER, dir_name) + "\\"
-        os_control.move_file(filename, source, destination)
-    else:
-        source = os_control.join_dir(current_directory, INPUT_FOLDER) + "\\"
-        destination = os_control.join_dir(current_directory, default_dir) + "\\"
-        os_control.move_file(filename, source, destination)
+    progress.emit("save")
+    result_dir = writer.directory
+    saved = list(writer.written)  # Before the original joins them
+    if not img_move_flag:
+        scheduler.record_no_results(settings["no_results_path"],  # Try others first next time
+                                    [(os_control.file_hash(path), os.path.getsize(path))])
+        writer = OutputWriter(default_dir, scan=False)  # Shared by every search, so too large to read
+    writer.stage_move(path)
+    writer.commit()
     to_print(multi_process, "moved", {"filename": filename})
-    return 1  # Increment counter
+
+    # Identical files get their own copy of the results, without searching again
+    for duplicate in duplicates:
+        if img_move_flag:
+            writer = OutputWriter(os_control.join_dir(current_directory, OUTPUT_FOLDER,
+                                                      os_control.result_dir_name(duplicate)))
+            for name in saved:
+                writer.copy_file(os_control.join_dir(result_dir, name), name)
+        else:
+            writer = OutputWriter(default_dir, scan=False)
+        writer.stage_move(os_control.join_dir(current_directory, INPUT_FOLDER, duplicate))
+        writer.commit()
+        to_print(multi_process, "moved", {"filename": duplicate})
+    return 1 + len(duplicates)  # Increment counter
 
 
-def extract_images(output_dir, DEFAULT_FOLDER):
+def timed_upscale(filename, **kwargs):
+    """ Wraps `upscale_image` for worker processes, reporting how long the search took and if it failed.
+    :param filename: File to upload.
+    :param kwargs: Remaining arguments to `upscale_image`.
+    :return: Tuple of the completion count, seconds taken, a boolean error flag, and the worker's memory use.
+    """
+    from .function import watchdog
+
+    start_time = time_now()
+    error = False
+    count = 1 + len(kwargs.get("duplicates", ()))
+    try:
+        count = profiled(upscale_image, kwargs["settings"])(filename, **kwargs)
+    except Exception:  # Keep the pool alive, but let the autotuner know something went wrong
+        error = True
+    progress.emit("done")
+    return count, time_now() - start_time, error, watchdog.process_memory()
+
+
+def profiled(function, settings):
+    """ Wraps a search function to profile it, if profiling is turned on.
+    :param function: Function to wrap.
+    :param settings: Dictionary of search settings. See `run`.
+    :return: The wrapped function, or the function itself.
+    """
+    if not settings["profile_dir"]:
+        return function
+    from .function import profiling
+    return partial(profiling.profile_call, settings["profile_dir"], settings["profile_memory"], function)
+
+
+def pool_context():
+    """ Chooses how worker processes start. Where possible, a fork server imports the scraping stack once and
+    forks each worker from it, so new and recycled workers start warm.
+    :return: A multiprocessing context.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(WORKER_PRELOAD)
+        return context
+    return multiprocessing.get_context()  # e.g. Windows, which can only spawn
+
+
+def init_worker(events):
+    """ Pool initializer. Sets up progress reporting, and imports the scraping stack before the first search
+    (a no-op after a warm fork).
+    :param events: Queue for progress events.
+    """
+    progress.set_queue(events)
+    for module in WORKER_PRELOAD:
+        __import__(module)
+
+
+def run_parallel(worker, groups, total, run_id):
+    """ Runs searches across a pool of processes, letting the autotuner decide how many run at once.
+    :param worker: Function taking a filename and its duplicates, returning the same tuple as `timed_upscale`.
+    :param groups: List of (filename, [identical filenames]) to search.
+    :param total: Number of files across all groups.
+    :param run_id: Identifier of the run, whose leftover browsers are killed once workers exit.
+    :return: Number of files processed.
+    """
+    import psutil
+    from .function import autotune
+    from .function import watchdog
+
+    cores = psutil.cpu_count(logical=False) or 1  # Get number of physical cores
+    tuner = autotune.Autotuner(start=cores, lower=1, upper=cores * MAX_PROCESS_FACTOR)
+    context = pool_context()
+
+    events = context.Queue()  # Progress events from the workers
+    dashboard = progress.Dashboard(total, sys.stdout)
+    listener = threading.Thread(target=dashboard.listen, args=(events,), daemon=True)
+    listener.start()
+    results = queue.Queue()  # Filled by the pool's result thread as searches complete
+
+    pending = list(reversed(groups))  # Popped from the end, keeping the original order
+    in_flight = 0
+    waiting = total  # Files not yet sent to a worker
+    files_processed = 0
+    recycle = False  # Set once a worker passes the memory limit. Drains the pool, then replaces it
+    Pool = context.Pool(processes=tuner.upper, maxtasksperchild=WORKER_MAX_TASKS, initializer=init_worker,
+                        initargs=(events,))
+    while pending or in_flight:
+        while pending and in_flight < tuner.level and not recycle:  # Top up to the current concurrency level
+            filename, duplicates = pending.pop()
+            Pool.apply_async(worker, (filename,), {"duplicates": duplicates}, callback=results.put,
+                             error_callback=lambda err, done=1 + len(duplicates): results.put((done, 0.0, True, 0)))
+            in_flight += 1
+            waiting -= 1 + len(duplicates)
+        dashboard.set_waiting(waiting)
+
+        if recycle and not in_flight:  # Every worker is idle, so none lose work when replaced
+            Pool.close()
+            Pool.join()
+            watchdog.kill_orphaned_browsers(run_id)
+            Pool = context.Pool(processes=tuner.upper, maxtasksperchild=WORKER_MAX_TASKS, initializer=init_worker,
+                                initargs=(events,))
+            recycle = False
+            continue
+
+        count, seconds, error, memory = results.get()
+        in_flight -= 1
+        files_processed += count
+        dashboard.complete(count)
+        if memory > WORKER_MEMORY_LIMIT and not recycle:
+            dashboard.message(cc.DGRAY + "[+] Worker using " + str(memory // 1024 ** 2)
+                              + "MB, recycling workers" + cc.RESET)
+            recycle = True
+        if tuner.record(seconds, error):
+            dashboard.message(cc.DGRAY + "[+] Concurrency set to " + str(tuner.level)
+                              + " (" + tuner.reason + ")" + cc.RESET)
+    Pool.close()
+    Pool.join()
+    watchdog.kill_orphaned_browsers(run_id)
+    events.put(None)  # Stop the listener once it has shown every event
+    listener.join()
+    dashboard.finish()
+    return files_processed
+
+
+def extract_images(output_dir, DEFAULT_FOLDER, index_path=None):
     """ Move manually sorted files to default folder.
     :param output_dir: Location to search through.
     :param DEFAULT_FOLDER: Location to move files.
+    :param index_path: Location of the folder index, or None to scan every folder.
     """
-    dir_list = os_control.list_dir(output_dir)  # Get list of folders from the output folder
-
-    count = 0
-    for folder in dir_list:  # Loop through folders, extracting single files from directories.
-        dir_name = os_control.join_dir(output_dir, folder)
-        if isdir(dir_name):  # Check folder is a directory
-            if folder == DEFAULT_FOLDER:
-                continue
-
-            # If directory has a single file, move it to default folder.
-            sub_dir_list = os_control.list_dir(dir_name)  # Get list of sub directories
-            num_files = len(sub_dir_list)  # Count sub directories
-            if num_files == 1:
-                filename = sub_dir_list[0]  # Select first hit (since there should only be one)
-                source = dir_name + "\\"
-                destination = os_control.join_dir(output_dir, DEFAULT_FOLDER) + "\\"
-                os_control.move_file(filename, source, destination)
-                count += 1
-
-            # Cleanup
-            os_control.remove_empty_dir(dir_name)
+    count = extract.extract_images(output_dir, DEFAULT_FOLDER, index_path)
     print(cc.GREEN + "Moved " + str(count) + " file(s)." + cc.RESET + "\n")
     print(cc.YELLOW + cc.BOLD + "Complete!" + cc.RESET)
 
 
+def index_results(output_dir, filenames, index_path):
+    """ Record the result folders of searched images in the extract index.
+    :param output_dir: Folder holding the result folders.
+    :param filenames: Names of the searched images.
+    :param index_path: Location of the folder index.
+    """
+    index = extract.load_index(index_path)
+    for filename in filenames:
+        extract.update_index(index, output_dir, os_control.result_dir_name(filename))
+    extract.save_index(index_path, index)
+
+
 def to_print(multi_process, key, data):
     """ Switch statement for choosing what to print.
     :param multi_process: Whether switch gets activated or not. Does not run when multi-threaded.
@@ -236,22 +464,3 @@ def to_print(multi_process, key, data):
             "moved": cc.LGREEN + data.get("filename", "DEFAULT") + " moved to output." + cc.RESET + "\n"
         }
         print(switcher.get(key, "Invalid key"))
-
-
-def loading(total, files_processed):
-    """ A progress bar
-    :param total: total number of items.
-    :param files_processed: current number of completed items.
-    """
-    sys.stdout.write('\r')
-    bar_value = int(files_processed / total * 100)
-    bar = ""
-    for i in range(bar_value):
-        bar += "█"
-    for i in range(99 - bar_value):
-        bar += " "
-    if bar_value < 100:
-        bar += "|"
-    sys.stdout.write(cc.LBLUE + bar + "  " + cc.RESET
-                     + str(bar_value) + "%" + " -- "
-                     + "[" + str(files_processed) + "/" + str(total) + "]")
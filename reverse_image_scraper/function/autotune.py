@@ -0,0 +1,83 @@
+# Standard library imports
+from time import time as time_now
+
+# Third party imports
+import psutil
+
+
+class Autotuner:
+    """ Picks how many images are searched at once. Searching is mostly spent waiting on the network and
+    rendering pages, so the best level depends on the connection rather than the number of cores.
+
+    The tuner watches completed searches in windows. While throughput keeps rising it adds a worker, when
+    throughput drops it removes one, and when errors, latency, or system memory climb past their limits it
+    backs off.
+    """
+
+    def __init__(self, start, lower, upper, error_limit=0.2, latency_limit=1.5, memory_limit=85.0, min_window=4):
+        """
+        :param start: Initial number of concurrent searches.
+        :param lower: Smallest level the tuner may choose.
+        :param upper: Largest level the tuner may choose.
+        :param error_limit: Fraction of failed searches in a window that triggers a back off.
+        :param latency_limit: Back off once average latency exceeds the best seen by this factor.
+        :param memory_limit: Back off once system memory use (percent) exceeds this value.
+        :param min_window: Least number of completed searches before a decision is made.
+        """
+        self.lower = max(1, lower)
+        self.upper = max(self.lower, upper)
+        self.level = min(max(start, self.lower), self.upper)
+        self.reason = "start"
+
+        self.error_limit = error_limit
+        self.latency_limit = latency_limit
+        self.memory_limit = memory_limit
+        self.min_window = min_window
+
+        self._samples = []  # (latency, error) pairs for the current window
+        self._window_start = time_now()
+        self._best_latency = None
+        self._last_throughput = None
+
+    def record(self, latency, error):
+        """ Records a completed search, and adjusts the level once the window is full.
+        :param latency: Seconds the search took.
+        :param error: Boolean. Whether the search failed (e.g. rate limited or no connection).
+        :return: Boolean whether the level changed.
+        """
+        self._samples.append((latency, error))
+        if len(self._samples) < max(self.level, self.min_window):  # Wait for a full window
+            return False
+
+        elapsed = max(time_now() - self._window_start, 1e-6)
+        throughput = len(self._samples) / elapsed
+        error_rate = sum(1 for _, err in self._samples if err) / len(self._samples)
+        mean_latency = sum(lat for lat, _ in self._samples) / len(self._samples)
+        memory = psutil.virtual_memory().percent
+
+        if self._best_latency is None or mean_latency < self._best_latency:
+            self._best_latency = mean_latency
+
+        level = self.level
+        if error_rate > self.error_limit:  # Likely rate limited. Back off hard
+            level, reason = level // 2, "error rate %d%%" % (error_rate * 100)
+        elif memory > self.memory_limit:  # Each worker may hold a browser. Back off hard
+            level, reason = level // 2, "memory at %d%%" % memory
+        elif mean_latency > self._best_latency * self.latency_limit:
+            level, reason = level - 1, "latency %.1fs" % mean_latency
+        elif self._last_throughput is None or throughput > self._last_throughput:
+            level, reason = level + 1, "throughput %.2f/s" % throughput
+        else:  # Adding workers stopped helping
+            level, reason = level - 1, "throughput %.2f/s" % throughput
+
+        # Start a new window
+        self._samples = []
+        self._window_start = time_now()
+        self._last_throughput = throughput
+
+        level = min(max(level, self.lower), self.upper)
+        if level == self.level:
+            return False
+        self.level = level
+        self.reason = reason
+        return True
@@ -0,0 +1,161 @@
+""" Search engines. A backend takes an image through four steps:
+
+    upload (image -> handle) -> results (handle -> results page) -> candidates (page -> image URLs)
+    -> fetch (image URL -> image and its size)
+
+Backends are plain objects so they can be sent to worker processes.
+"""
+# Standard library imports
+import os
+import hashlib
+from io import BytesIO
+
+# Third party imports
+from PIL import Image, UnidentifiedImageError
+
+# Local imports
+from . import os_control
+from . import web_control
+from ..common.colors import ColorCodes as cc
+
+
+class GoogleBackend:
+    """ Google's reverse image search. """
+
+    RESULTS_LINK_TEXT = "All sizes"  # Link from the first results page to the page listing every size
+
+    def upload(self, session, path, data=None):
+        """ Upload an image.
+        :param session: HTML session to access the internet.
+        :param path: Location of image on file.
+        :param data: Bytes to upload in place of the file, or None.
+        :return: Handle for `results` (the results page URL), or None if there are no results.
+        """
+        return web_control.send_image(session, path, data)
+
+    def results(self, session, handle):
+        """ Get the page listing candidate images.
+        :param session: HTML session to access the internet.
+        :param handle: Value from `upload`.
+        :return: HTML page as bytes, or None if there is none.
+        """
+        page = web_control.get_page_bytes(session, handle)
+        request = web_control.href_from_bytes(session, page, self.RESULTS_LINK_TEXT)
+        return None if request is None else request.content
+
+    def candidates(self, page, limit):
+        """ Get candidate image URLs from a results page, in page order.
+        :param page: Value from `results`.
+        :param limit: Most URLs to return.
+        :return: List of URLs.
+        """
+        return web_control.img_links_from_bytes(page, limit)
+
+    def fetch(self, session, url):
+        """ Download a candidate image.
+        :param session: HTML session to access the internet.
+        :param url: Address of the image.
+        :return: Same as `web_control.img_size`.
+        """
+        return web_control.img_size(session, url)
+
+
+def url_key(url):
+    """ File name used to record a URL.
+    :param url: Web address.
+    :return: String.
+    """
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+class FixtureBackend(GoogleBackend):
+    """ Replays recorded searches from a folder, without touching the network. Searches are matched to
+    recordings by the contents of the uploaded image, so runs are repeatable.
+
+    Folder layout:
+        pages/<SHA-1 of the image file>.html   results page for that image
+        images/<SHA-1 of the URL>              body of a candidate image
+    Images without a page have no results. Candidates without a body are invalid links.
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: Folder of recordings.
+        """
+        self.directory = directory
+
+    def page_path(self, handle):
+        return os_control.join_dir(self.directory, "pages", handle + ".html")
+
+    def image_path(self, url):
+        return os_control.join_dir(self.directory, "images", url_key(url))
+
+    def upload(self, session, path, data=None):
+        handle = os_control.file_hash(path)
+        return handle if os.path.isfile(self.page_path(handle)) else None
+
+    def results(self, session, handle):
+        with open(self.page_path(handle), "rb") as file:
+            return file.read()
+
+    def fetch(self, session, url):
+        try:
+            with open(self.image_path(url), "rb") as file:
+                img = Image.open(BytesIO(file.read()))
+        except (OSError, UnidentifiedImageError):  # Not recorded, or not an image
+            return None, -1, -1, None
+        width, height = img.size
+        return img, width, height, None
+
+
+class RecordingBackend(FixtureBackend):
+    """ Searches with Google, recording every results page and candidate image for `FixtureBackend`. """
+
+    def __init__(self, directory):
+        """
+        :param directory: Folder to record into.
+        """
+        super().__init__(directory)
+        self.google = GoogleBackend()
+        os.makedirs(os_control.join_dir(directory, "pages"), exist_ok=True)
+        os.makedirs(os_control.join_dir(directory, "images"), exist_ok=True)
+
+    def upload(self, session, path, data=None):
+        result_url = self.google.upload(session, path, data)
+        return None if result_url is None else (os_control.file_hash(path), result_url)
+
+    def results(self, session, handle):
+        image_hash, result_url = handle
+        page = self.google.results(session, result_url)
+        if page is not None:
+            with open(self.page_path(image_hash), "wb") as file:
+                file.write(page)
+        return page
+
+    def fetch(self, session, url):
+        img, width, height, err = self.google.fetch(session, url)
+        if img is not None:
+            buffer = BytesIO()
+            img.save(buffer, img.format)  # Re-encoded, keeping the format and size
+            with open(self.image_path(url), "wb") as file:
+                file.write(buffer.getvalue())
+        return img, width, height, err
+
+
+def get_backend(name, directory=None):
+    """ Build a backend from its name. Closes program if the name or folder is invalid.
+    :param name: "google", "fixture" (replay from `directory`), or "record" (Google, recording into `directory`).
+    :param directory: Folder of recordings.
+    :return: Backend object.
+    """
+    if name == "google":
+        return GoogleBackend()
+    if name in ("fixture", "record") and directory:
+        if name == "record":
+            return RecordingBackend(directory)
+        if os.path.isdir(directory):
+            return FixtureBackend(directory)
+        print(cc.RED + cc.BOLD + "Fixture folder: '" + directory + "' does not exist!" + cc.RESET)
+        exit()
+    print(cc.RED + cc.BOLD + "Unknown backend '" + name + "', or missing 'fixtures=<folder>'." + cc.RESET)
+    exit()
@@ -0,0 +1,120 @@
+# Standard library imports
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Local imports
+from . import os_control
+
+# Number of folders scanned at once. Scanning mostly waits on the disk
+THREADS = 16
+
+
+def count_files(directory, limit=2):
+    """ Count the entries in a folder, stopping once `limit` is reached.
+    :param directory: Folder to count.
+    :param limit: Stop counting at this many entries.
+    :return: Number of entries (at most `limit`), and the name of the first entry or None.
+    """
+    count = 0
+    first = None
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if first is None:
+                first = entry.name
+            count += 1
+            if count >= limit:
+                break
+    return count, first
+
+
+def load_index(path):
+    """ Read the index of folder states.
+    :param path: Location of the index file.
+    :return: Dictionary of folder name to [modified time (ns), file count up to 2].
+    """
+    try:
+        with open(path, "r") as file:
+            index = json.load(file)
+    except (FileNotFoundError, ValueError):  # First run, or a damaged index which is simply rebuilt
+        return {}
+    return index if isinstance(index, dict) else {}
+
+
+def save_index(path, index):
+    """ Write the index of folder states, replacing the old one in one step.
+    :param path: Location of the index file.
+    :param index: Dictionary from `load_index`.
+    """
+    temporary = path + ".part"
+    with open(temporary, "w") as file:
+        json.dump(index, file)
+    os.replace(temporary, path)
+
+
+def update_index(index, output_dir, folder):
+    """ Record the current state of a result folder, or forget it if it no longer exists.
+    :param index: Dictionary from `load_index`.
+    :param output_dir: Folder holding the result folders.
+    :param folder: Name of the result folder.
+    """
+    directory = os_control.join_dir(output_dir, folder)
+    try:
+        modified = os.stat(directory).st_mtime_ns
+        count, _ = count_files(directory)
+    except (FileNotFoundError, NotADirectoryError):
+        index.pop(folder, None)
+        return
+    index[folder] = [modified, count]
+
+
+def extract_folder(directory, default_dir):
+    """ Move the file out of a folder holding a single file, and remove the folder if it is then empty.
+    :param directory: Result folder.
+    :param default_dir: Folder to move single files to.
+    :return: Boolean whether a file was moved.
+    """
+    count, first = count_files(directory)
+    moved = False
+    if count == 1:
+        os_control.move_file(first, directory, default_dir)
+        moved = True
+    if count <= 1:
+        os.rmdir(directory)  # Cleanup
+    return moved
+
+
+def extract_images(output_dir, default_folder, index_path=None):
+    """ Move files out of every result folder holding a single file, scanning folders in parallel.
+    :param output_dir: Location to search through.
+    :param default_folder: Name of the folder to move files to.
+    :param index_path: Location of the index file. Folders unchanged since they were last indexed are skipped.
+        No index is used if None.
+    :return: Number of files moved.
+    """
+    index = load_index(index_path) if index_path else {}
+    default_dir = os_control.join_dir(output_dir, default_folder)
+
+    folders = []  # Folders needing a scan
+    present = set()  # Every result folder
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if entry.name == default_folder or not entry.is_dir():
+                continue
+            present.add(entry.name)
+            if entry.name in index and index[entry.name] == [entry.stat().st_mtime_ns, 2]:
+                continue  # Unchanged, and holding more than one file
+            folders.append(entry.name)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        moved = executor.map(lambda folder: extract_folder(os_control.join_dir(output_dir, folder), default_dir),
+                             folders)
+        count = sum(moved)
+
+    if index_path:
+        for folder in folders:
+            update_index(index, output_dir, folder)
+        for folder in [folder for folder in index if folder not in present]:
+            index.pop(folder)  # Deleted by the user
+        save_index(index_path, index)
+    return count
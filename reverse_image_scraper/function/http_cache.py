@@ -0,0 +1,283 @@
+# Standard library imports
+import os
+import json
+import hashlib
+from io import BytesIO
+from functools import partial
+from time import time as time_now
+from email.utils import parsedate_to_datetime
+
+# Third party imports
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Each process re-measures the cache once it has written this fraction of the limit since it last measured, so
+# growth from other processes is noticed before the cache gets far past its limit
+MEASURE_FRACTION = 0.02
+
+# Headers describing the body as it was sent, which no longer apply once it is stored decoded
+DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+
+def cache_control(headers):
+    """ Parse a Cache-Control header.
+    :param headers: Headers of a request or response.
+    :return: Dictionary of directive to value (None for directives without a value).
+    """
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers):
+    """ How long a response may be used without asking the server again.
+    :param headers: Headers of the response.
+    :return: Seconds, or 0 if it must always be revalidated.
+    """
+    directives = cache_control(headers)
+    if "no-cache" in directives:
+        return 0
+    try:
+        return max(0, int(directives.get("max-age")))
+    except (TypeError, ValueError):
+        pass
+    try:  # Fall back to Expires
+        return max(0, parsedate_to_datetime(headers["Expires"]).timestamp() - parsedate_to_datetime(
+            headers["Date"]).timestamp())
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def is_cacheable(response):
+    """ Whether a response is worth storing: successful, allowed, and either fresh for a while or revalidatable.
+    :param response: Response to check.
+    :return: Boolean.
+    """
+    if response.status_code != 200 or "no-store" in cache_control(response.headers):
+        return False
+    has_validator = "ETag" in response.headers or "Last-Modified" in response.headers
+    return has_validator or freshness_lifetime(response.headers) > 0
+
+
+class HTTPCache:
+    """ Stores responses on disk, one metadata file and one body file per URL. When the bodies grow past
+    `max_bytes`, the least recently used responses are removed.
+    """
+
+    def __init__(self, directory, max_bytes):
+        """
+        :param directory: Folder to store responses in.
+        :param max_bytes: Total size of bodies to keep.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None  # Estimated size of all bodies. Counted on first store
+        self._written = 0  # Bytes this process has stored since last counting
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".json"), os.path.join(self.directory, key + ".body")
+
+    def load(self, url):
+        """ Get a stored response, marking it as recently used.
+        :param url: Address of the response.
+        :return: Tuple of the metadata dictionary and body bytes, or None if it isn't stored.
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as file:
+                meta = json.load(file)
+            with open(body_path, "rb") as file:
+                body = file.read()
+            os.utime(meta_path)  # Recently used
+        except (OSError, ValueError):  # Missing, or removed by another process part way through
+            return None
+        return meta, body
+
+    def store(self, url, meta, body):
+        """ Store a response, then remove old responses if the cache is too large.
+        :param url: Address of the response.
+        :param meta: Dictionary of status, reason, headers, and the time it was stored.
+        :param body: Body bytes.
+        """
+        meta_path, body_path = self._paths(url)
+        self._write(body_path, body, "wb")
+        self._write(meta_path, json.dumps(meta), "w")
+
+        self._written += len(body)
+        if self._size is None or self._written > self.max_bytes * MEASURE_FRACTION:  # Other processes write too
+            self._size = self._measure()
+            self._written = 0
+        else:
+            self._size += len(body)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def store_meta(self, url, meta):
+        """ Replace the metadata of a stored response, keeping its body (e.g. after a 304 reply).
+        :param url: Address of the response.
+        :param meta: Dictionary of status, reason, headers, and the time it was stored.
+        """
+        self._write(self._paths(url)[0], json.dumps(meta), "w")
+
+    def _write(self, path, data, mode):
+        temporary = path + ".%d.part" % os.getpid()
+        with open(temporary, mode) as file:
+            file.write(data)
+        os.replace(temporary, path)  # Readers never see a partial file
+
+    def _measure(self):
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".body"):
+                    total += entry.stat().st_size
+        return total
+
+    def evict(self):
+        """ Remove the least recently used responses until the cache is back under 90% of its limit. """
+        entries = []  # (last used, body size, meta path, body path)
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(".json"):
+                    continue
+                body_path = entry.path[:-len(".json")] + ".body"
+                try:
+                    entries.append((entry.stat().st_mtime, os.path.getsize(body_path), entry.path, body_path))
+                except OSError:
+                    continue
+        entries.sort()
+
+        total = sum(entry[1] for entry in entries)
+        for _, size, meta_path, body_path in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:  # Already removed by another process
+                    pass
+            total -= size
+        self._size = total
+
+
+class TeeReader:
+    """ Wraps the raw body of a streamed response, keeping a copy of what `iter_content` reads. Once the whole
+    body has been read, the copy is passed on to be stored. Everything else is passed to the wrapped body.
+    """
+
+    def __init__(self, raw, on_complete):
+        """
+        :param raw: urllib3 response being read.
+        :param on_complete: Function called with the decoded body once it has all been read.
+        """
+        self.raw = raw
+        self.on_complete = on_complete
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        """ Read the body in chunks. Used by `Response.iter_content`. """
+        chunks = []
+        for data in self.raw.stream(amt, decode_content=True):  # Stored bodies are decoded. See DROPPED_HEADERS
+            chunks.append(data)
+            yield data
+        self.on_complete(b"".join(chunks))  # Not reached if the caller stops part way
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+class CachingAdapter(HTTPAdapter):
+    """ Transport adapter answering GET requests from an `HTTPCache`. Fresh responses are served without
+    contacting the server. Stale ones are revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged page costs a 304 instead of the full body.
+    """
+
+    def __init__(self, cache, **kwargs):
+        """
+        :param cache: HTTPCache to use.
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        if request.method != "GET" or "no-store" in cache_control(request.headers):
+            return super().send(request, **kwargs)
+
+        entry = self.cache.load(request.url)
+        if entry is not None:
+            meta, body = entry
+            headers = CaseInsensitiveDict(meta["headers"])
+            if time_now() - meta["stored"] < freshness_lifetime(headers):
+                return self.build_cached_response(request, meta, body)
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:  # Unchanged. Refresh the stored headers
+            headers.update({name: value for name, value in response.headers.items()
+                            if name.lower() not in DROPPED_HEADERS})
+            meta["headers"] = dict(headers)
+            meta["stored"] = time_now()
+            self.cache.store_meta(request.url, meta)
+            response.close()
+            return self.build_cached_response(request, meta, body)
+
+        if is_cacheable(response):
+            meta = {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": {name: value for name, value in response.headers.items()
+                            if name.lower() not in DROPPED_HEADERS},
+                "stored": time_now(),
+            }
+            if kwargs.get("stream"):  # Stored only if the caller reads it all, as it may stop part way
+                response.raw = TeeReader(response.raw, partial(self.cache.store, request.url, meta))
+            else:
+                self.cache.store(request.url, meta, response.content)
+        return response
+
+    def build_cached_response(self, request, meta, body):
+        """ Builds a response from stored data, as if it came from the server.
+        :param request: The prepared request being answered.
+        :param meta: Stored metadata.
+        :param body: Stored body bytes.
+        :return: requests.Response
+        """
+        response = Response()
+        response.status_code = meta["status"]
+        response.reason = meta["reason"]
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.raw = BytesIO(body)
+        response._content = body
+        response._content_consumed = True  # Serve iter_content from `_content` instead of `raw`
+        return response
+
+
+# One HTTPCache per folder for each process, so its size is only counted once
+_caches = {}
+
+
+def install(session, directory, max_bytes):
+    """ Routes a session's requests through a disk cache.
+    :param session: Session to cache.
+    :param directory: Folder to store responses in.
+    :param max_bytes: Total size of bodies to keep.
+    """
+    if directory not in _caches:
+        _caches[directory] = HTTPCache(directory, max_bytes)
+    adapter = CachingAdapter(_caches[directory])
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
@@ -0,0 +1,46 @@
+# Standard library imports
+import os
+from io import BytesIO
+from math import sqrt
+
+# Third party imports
+from PIL import Image, ImageOps, features
+
+# PIL only reads AVIF from version 11.2. Older versions don't know the name of the feature
+AVIF_SUPPORTED = "avif" in features.modules and features.check_module("avif")
+
+
+def prepare_upload(path, max_bytes, max_pixels, quality=85):
+    """ Shrinks an image that is too large to upload quickly (or at all) into an in-memory JPEG.
+    JPEGs are decoded at reduced scale (draft mode), so large photos are never fully decoded.
+    :param path: Location of image on file.
+    :param max_bytes: Largest file size uploaded as is.
+    :param max_pixels: Largest pixel count uploaded as is.
+    :param quality: JPEG quality of the shrunken image.
+    :return: JPEG bytes to upload instead, or None if the original is within budget.
+    """
+    size = os.path.getsize(path)
+    with Image.open(path) as img:
+        width, height = img.size
+        if size <= max_bytes and width * height <= max_pixels:  # Small enough to send as is
+            return None
+
+        scale = min(1.0, sqrt(max_pixels / (width * height)))
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+        img.draft("RGB", target)  # Only JPEGs support this. Decodes at 1/2, 1/4 or 1/8 scale
+        small = img.convert("RGB")  # JPEG has no transparency or palettes
+        small = ImageOps.exif_transpose(small)  # The copy is sent without EXIF, so turn it upright, as it is shown
+        if small.size != img.size:  # Turned a quarter
+            target = target[::-1]
+
+    data = None
+    for _ in range(4):  # Re-encoding alone may not meet the byte budget, so keep halving
+        small.thumbnail(target)
+        buffer = BytesIO()
+        small.save(buffer, "JPEG", quality=quality)
+        data = buffer.getvalue()
+        if len(data) <= max_bytes:
+            break
+        target = (max(1, target[0] // 2), max(1, target[1] // 2))
+    small.close()
+    return data
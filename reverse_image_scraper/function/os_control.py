@@ -1,5 +1,6 @@
 # Standard library imports
 import os
+import hashlib
 from time import sleep
 
 # Local imports
@@ -10,9 +11,8 @@ def get_main_dir():
     """ Finds root of this project.
     :return: Full file path to parent directory.
     """
-    directory = os.path.dirname(__file__)
-    index = directory[:directory.rfind("\\")].rfind("\\")  # find index of second last "\"
-    return directory[:index]  # Return everything up to that last backslash
+    directory = os.path.dirname(os.path.abspath(__file__))  # .../reverse_image_scraper/function
+    return os.path.dirname(os.path.dirname(directory))  # Two folders up, on any OS
 
 
 def exceed_NTFS_file_limit(directory):
@@ -100,25 +100,103 @@ def make_dir(name, directory):
         exit()
 
 
+def result_dir_name(filename):
+    """ Name of the folder holding the results for an image. e.g. 'cat.jpg' -> 'cat(jpg)'
+    :param filename: Image file name (including file extension).
+    :return: Folder name.
+    """
+    index = filename.rfind(".")  # Separate name and extension
+    return filename[:index] + "(" + filename[index + 1:] + ")"  # Add file extension to name
+
+
+def numbered_name(filename, count):
+    """ Adds a number to a file name, keeping the extension. e.g. 'name.txt' -> 'name(2).txt'
+    :param filename: File name (including file extension).
+    :param count: Number to add.
+    :return: New file name.
+    """
+    index = filename.rfind(".")  # Find index of separation between name and extension
+    if index <= 0:  # No extension, or a hidden file
+        index = len(filename)
+    return filename[:index] + "(" + str(count) + ")" + filename[index:]
+
+
+def rename_no_replace(source, destination):
+    """ Atomically moves a file, refusing to replace an existing file (which os.rename does outside of Windows).
+    :param source: Full path of the file to move.
+    :param destination: Full path to move it to.
+    :raises FileExistsError: If the destination is taken.
+    """
+    if os.name == "nt":
+        os.rename(source, destination)  # Already refuses to replace files
+        return
+    try:
+        os.link(source, destination)  # Fails if the destination exists
+    except FileExistsError:
+        raise
+    except OSError:  # File system without hard links
+        if os.path.exists(destination):
+            raise FileExistsError(destination)
+        os.rename(source, destination)
+    else:
+        os.unlink(source)
+
+
 def move_file(filename, source, destination):
     """ Attempts to move file. If moving would cause data loss, then the file is renamed until it can be moved safely.
     :param filename: File to move (including fil extension).
     :param source: Current location of the file to be moved.
     :param destination: New location of the file.
+    :return: Name of the file in its new location.
     """
     filename_new = filename  # Copy of name for editing
 
-    index = filename.rfind(".")  # Find index of separation between name and extension
-    title = filename[:index]  # Record file's name
-    extension = filename[index:]  # Record file's data type extension
-
-    can_move = False
     count = 1
-    while not can_move:  # Continue until file can be moved
+    while True:  # Continue until file can be moved
         try:
-            os.rename(source + filename, destination + filename_new)    # Move file to new location
-            can_move = True
+            rename_no_replace(os.path.join(source, filename), os.path.join(destination, filename_new))
+            return filename_new
         except FileExistsError:  # File name is already taken
-            filename_new = title + "(" + str(count) + ")" + extension  # Increment file name
+            filename_new = numbered_name(filename, count)  # Increment file name
             count += 1
 
+
+def file_hash(path):
+    """ Hash a file's contents.
+    :param path: Location of the file.
+    :return: Hex digest string.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def group_duplicates(directory, filenames):
+    """ Groups files with identical contents. Only files of the same size are hashed.
+    :param directory: Folder holding the files.
+    :param filenames: List of file names.
+    :return: List of (filename, [names of identical files]) tuples, in the order of `filenames`.
+    """
+    by_size = {}
+    for filename in filenames:
+        by_size.setdefault(os.path.getsize(join_dir(directory, filename)), []).append(filename)
+
+    leaders = {}  # File name to the first file with the same contents
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        first_with_hash = {}
+        for filename in same_size:
+            digest = file_hash(join_dir(directory, filename))
+            leaders[filename] = first_with_hash.setdefault(digest, filename)
+
+    groups = {}
+    for filename in filenames:
+        leader = leaders.get(filename, filename)
+        if leader == filename:
+            groups[filename] = []
+        else:
+            groups[leader].append(filename)
+    return list(groups.items())
@@ -0,0 +1,123 @@
+# Standard library imports
+import os
+import shutil
+
+# Local imports
+from . import os_control
+
+
+class OutputWriter:
+    """ Writes the results of one search into a folder.
+
+    The folder is created the first time something is written to it, and its file names are read once and
+    then tracked in memory, so name clashes are resolved without asking the OS. Moves are queued and done
+    together by `commit`.
+    """
+
+    def __init__(self, directory, scan=True):
+        """
+        :param directory: Folder to write into.
+        :param scan: Whether to read the names already in the folder. Turn off for large shared folders, where
+            clashes are instead found when a move fails.
+        """
+        self.directory = directory
+        self.scan = scan
+        self.created = False
+        self._names = set()  # Names known to be taken in the folder
+        self._moves = []  # Full paths of files to move in on commit
+        self.written = []  # Names of the images and notes written so far
+
+    def _make_dir(self):
+        """ Create the folder once, reading existing names if it was already there. """
+        if self.created:
+            return
+        try:
+            os.makedirs(self.directory)
+        except FileExistsError:  # e.g. a search of an image with the same name
+            if self.scan:
+                self._names.update(os.listdir(self.directory))
+        self.created = True
+
+    def unique_name(self, name):
+        """ Reserve a name that is free in the folder. e.g. 'name.jpg' -> 'name(1).jpg'
+        :param name: Wanted file name.
+        :return: Reserved file name.
+        """
+        new_name = name
+        count = 1
+        while new_name in self._names:
+            new_name = os_control.numbered_name(name, count)
+            count += 1
+        self._names.add(new_name)
+        return new_name
+
+    def save_image(self, img, name):
+        """ Save an image under a free name. The image is written to a temporary file first, so a partly
+        written image never appears under its real name.
+        :param img: Image to be saved.
+        :param name: Wanted file name.
+        :return: The name saved under, or None if the image failed to save.
+        """
+        self._make_dir()
+        name = self.unique_name(name)
+        temporary = os_control.join_dir(self.directory, "." + name + ".part")
+        if not os_control.save_image(img, temporary):
+            self._names.discard(name)
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return None
+        os.replace(temporary, os_control.join_dir(self.directory, name))
+        self.written.append(name)
+        return name
+
+    def copy_file(self, source, name):
+        """ Copy a file into the folder under a free name, in the same way as `save_image`.
+        :param source: Full path of the file.
+        :param name: Wanted file name.
+        :return: The name copied to.
+        """
+        self._make_dir()
+        name = self.unique_name(name)
+        temporary = os_control.join_dir(self.directory, "." + name + ".part")
+        shutil.copyfile(source, temporary)
+        os.replace(temporary, os_control.join_dir(self.directory, name))
+        self.written.append(name)
+        return name
+
+    def make_note(self, title):
+        """ Create an empty file with a message as its title, once.
+        :param title: Message.
+        """
+        self._make_dir()
+        if title in self._names:
+            return
+        os_control.make_note(self.directory, title)
+        self._names.add(title)
+        self.written.append(title)
+
+    def stage_move(self, source):
+        """ Queue a file to be moved into the folder on `commit`.
+        :param source: Full path of the file.
+        """
+        self._moves.append(source)
+
+    def commit(self):
+        """ Move all queued files into the folder, renaming any that clash with existing files.
+        :return: List of the names the files were moved to.
+        """
+        if not self._moves:
+            return []
+        self._make_dir()
+        moved = []
+        for source in self._moves:
+            filename = os.path.basename(source)
+            name = self.unique_name(filename)
+            while True:
+                try:
+                    os_control.rename_no_replace(source, os_control.join_dir(self.directory, name))
+                    break
+                except FileExistsError:  # Added by something else since the folder was read
+                    name = self.unique_name(filename)
+            moved.append(name)
+        self._moves = []
+        return moved
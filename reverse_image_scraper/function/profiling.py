@@ -0,0 +1,141 @@
+""" Profiling of searches, including those run in worker processes.
+
+Each process profiles its own searches and writes its totals to the "workers" folder after every search, so
+nothing is lost when a worker is replaced. Once the run is over, `write_report` merges them.
+"""
+# Standard library imports
+import os
+import io
+import json
+import shutil
+import pstats
+import cProfile
+import tracemalloc
+
+WORKERS_FOLDER = "workers"  # Per-process results, merged by `write_report`
+STATS_FILE = "profile.pstats"  # Merged cProfile stats. Open with `python -m pstats` or snakeviz
+REPORT_FILE = "profile.txt"  # Slowest functions
+MEMORY_FILE = "memory.txt"  # Largest allocations, if memory was traced
+MEMORY_FRAMES = 1  # Frames recorded per allocation. More show callers, but slow searches down further
+
+# Profiler of this process. Created on its first search
+_profiler = None
+_searches = 0
+_peak = 0
+
+
+def start(directory):
+    """ Prepare a folder for a new run, removing results of a previous one.
+    :param directory: Folder to write profiles to.
+    """
+    shutil.rmtree(os.path.join(directory, WORKERS_FOLDER), ignore_errors=True)
+    os.makedirs(os.path.join(directory, WORKERS_FOLDER))
+
+
+def profile_call(directory, memory, function, *args, **kwargs):
+    """ Run a function under cProfile (and tracemalloc), adding to this process's totals.
+    :param directory: Folder to write profiles to.
+    :param memory: Boolean. Also trace memory allocations.
+    :param function: Function to profile.
+    :param args: Arguments to the function.
+    :param kwargs: Keyword arguments to the function.
+    :return: What the function returns.
+    """
+    global _profiler, _searches, _peak
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+    if memory and hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_FRAMES)
+        tracemalloc.reset_peak()
+    elif memory:  # Restarting is the only way to reset the peak. Memory held from earlier searches is forgotten
+        tracemalloc.stop()
+        tracemalloc.start(MEMORY_FRAMES)
+
+    _profiler.enable()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        _profiler.disable()
+        _searches += 1
+        if memory:
+            _peak = max(_peak, tracemalloc.get_traced_memory()[1])
+        save(directory, memory)
+
+
+def save(directory, memory):
+    """ Write this process's totals so far, replacing its previous ones.
+    :param directory: Folder to write profiles to.
+    :param memory: Boolean. Also write a snapshot of traced memory.
+    """
+    base = os.path.join(directory, WORKERS_FOLDER, str(os.getpid()))
+    if memory:  # Before dumping the stats, which allocates a lot
+        tracemalloc.take_snapshot().dump(base + ".snapshot")
+    _profiler.dump_stats(base + ".prof")
+    with open(base + ".json", "w") as file:
+        json.dump({"searches": _searches, "peak": _peak}, file)
+
+
+def write_report(directory, top=40):
+    """ Merge the results of every process, and write the reports.
+    :param directory: Folder profiles were written to.
+    :param top: Number of functions and allocation sites to list.
+    :return: List of files written.
+    """
+    workers = os.path.join(directory, WORKERS_FOLDER)
+    names = sorted(os.listdir(workers)) if os.path.isdir(workers) else []
+    profiles = [os.path.join(workers, name) for name in names if name.endswith(".prof")]
+    if not profiles:  # Nothing was searched
+        return []
+
+    written = []
+    stats = pstats.Stats(*profiles)
+    stats.dump_stats(os.path.join(directory, STATS_FILE))
+    written.append(os.path.join(directory, STATS_FILE))
+
+    searches = peak = 0
+    for name in names:
+        if name.endswith(".json"):
+            with open(os.path.join(workers, name)) as file:
+                totals = json.load(file)
+            searches += totals["searches"]
+            peak = max(peak, totals["peak"])
+
+    report = io.StringIO()
+    report.write("%d searches across %d processes\n\n" % (searches, len(profiles)))
+    stats.stream = report
+    stats.sort_stats("cumulative").print_stats(top)
+    stats.sort_stats("tottime").print_stats(top)
+    with open(os.path.join(directory, REPORT_FILE), "w") as file:
+        file.write(report.getvalue())
+    written.append(os.path.join(directory, REPORT_FILE))
+
+    snapshots = [os.path.join(workers, name) for name in names if name.endswith(".snapshot")]
+    if snapshots:
+        with open(os.path.join(directory, MEMORY_FILE), "w") as file:
+            file.write(memory_report(snapshots, peak, top))
+        written.append(os.path.join(directory, MEMORY_FILE))
+    return written
+
+
+def memory_report(snapshots, peak, top):
+    """ List the lines holding the most memory at the end of the run, summed across processes.
+    :param snapshots: Locations of tracemalloc snapshots, one per process.
+    :param peak: Largest memory use of a single search, in bytes.
+    :param top: Number of lines to list.
+    :return: Report text.
+    """
+    sites = {}  # (file, line) to [size, count]
+    for path in snapshots:
+        for stat in tracemalloc.Snapshot.load(path).statistics("lineno"):
+            frame = stat.traceback[0]
+            site = sites.setdefault((frame.filename, frame.lineno), [0, 0])
+            site[0] += stat.size
+            site[1] += stat.count
+
+    lines = ["Peak traced memory of one search: %.1f MB" % (peak / 1024 ** 2),
+             "Memory still held after the last search of each process: %.1f MB"
+             % (sum(size for size, _ in sites.values()) / 1024 ** 2), ""]
+    for (filename, lineno), (size, count) in sorted(sites.items(), key=lambda item: -item[1][0])[:top]:
+        lines.append("%10.1f KB %8d blocks  %s:%d" % (size / 1024, count, filename, lineno))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,172 @@
+# Standard library imports
+import os
+import threading
+from time import time as time_now
+
+# Local imports
+from ..common.colors import ColorCodes as cc
+
+# Stages of a search, in order. Workers report which one they are in
+STAGES = ("upload", "render", "download", "save")
+
+# Queue events are sent on from a worker process. None when not running in a pool
+_events = None
+
+
+def set_queue(events):
+    """ Send this process's events to a queue. Called when a worker process starts.
+    :param events: multiprocessing Queue, or None to stop sending events.
+    """
+    global _events
+    _events = events
+
+
+def emit(kind, value=None):
+    """ Report progress from a worker. Does nothing outside a pool.
+    :param kind: One of STAGES, "bytes", or "done".
+    :param value: Number of bytes for "bytes" events.
+    """
+    if _events is not None:
+        _events.put((os.getpid(), kind, value))
+
+
+def format_duration(seconds):
+    """ e.g. 125 -> '2m 05s'
+    :param seconds: Number of seconds.
+    :return: String.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    return "%dm %02ds" % (minutes, seconds)
+
+
+def format_bytes(count):
+    """ e.g. 1536 -> '1.5 KB'
+    :param count: Number of bytes.
+    :return: String.
+    """
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return "%.1f %s" % (count, unit)
+        count /= 1024
+    return "%.1f GB" % count
+
+
+class Dashboard:
+    """ Status line for a multi-process search, fed by worker events.
+
+    On a terminal, one line is redrawn at most every `interval` seconds. Otherwise (e.g. output sent to a
+    file), a plain log line is written every `log_interval` seconds.
+    """
+
+    def __init__(self, total, stream, interval=0.25, log_interval=10.0):
+        """
+        :param total: Number of files to process.
+        :param stream: Where to write, usually sys.stdout.
+        :param interval: Least seconds between redraws on a terminal.
+        :param log_interval: Seconds between log lines when not on a terminal.
+        """
+        self.total = total
+        self.stream = stream
+        self.is_tty = hasattr(stream, "isatty") and stream.isatty()
+        self.interval = interval if self.is_tty else log_interval
+
+        self.completed = 0
+        self.waiting = total  # Files not yet picked up by a worker
+        self.bytes = 0
+        self.stages = {}  # Worker pid to its current stage
+
+        self._start = time_now()
+        self._last_render = 0.0
+        self._lock = threading.Lock()
+
+    def handle(self, event):
+        """ Update from a worker event.
+        :param event: (pid, kind, value) tuple from `emit`.
+        """
+        pid, kind, value = event
+        with self._lock:
+            if kind == "bytes":
+                self.bytes += value
+            elif kind == "done":
+                self.stages.pop(pid, None)
+            elif kind in STAGES:
+                self.stages[pid] = kind
+        self.render()
+
+    def set_waiting(self, waiting):
+        """ Record how many files have not been sent to a worker yet.
+        :param waiting: Number of files.
+        """
+        with self._lock:
+            self.waiting = waiting
+
+    def complete(self, count):
+        """ Record finished files, and redraw immediately.
+        :param count: Number of files finished.
+        """
+        with self._lock:
+            self.completed += count
+        self.render(force=self.is_tty)  # Log lines stay periodic
+
+    def message(self, text):
+        """ Print a message on its own line, without breaking the status line.
+        :param text: Message.
+        """
+        with self._lock:
+            if self.is_tty:
+                self.stream.write("\r\033[K")  # Clear the status line
+            self.stream.write(text + "\n")
+        self.render(force=self.is_tty)
+
+    def status(self):
+        """ Build the status line.
+        :return: String.
+        """
+        elapsed = max(time_now() - self._start, 1e-6)
+        rate = self.completed / elapsed
+        depths = {stage: 0 for stage in STAGES}
+        for stage in self.stages.values():
+            depths[stage] += 1
+        remaining = self.total - self.completed
+        eta = format_duration(remaining / rate) if rate > 0 else "--"
+        percent = int(self.completed / self.total * 100) if self.total else 100
+
+        line = ("[" + str(self.completed) + "/" + str(self.total) + "] " + str(percent) + "%"
+                + " | %.2f img/s | %s/s" % (rate, format_bytes(self.bytes / elapsed))
+                + " | workers " + str(len(self.stages))
+                + " | waiting " + str(self.waiting) + " "
+                + " ".join(stage + " " + str(depths[stage]) for stage in STAGES)
+                + " | ETA " + eta)
+        if self.is_tty:
+            bar_width = 30
+            filled = bar_width * percent // 100
+            line = cc.LBLUE + "█" * filled + " " * (bar_width - filled) + "|" + cc.RESET + " " + line
+        return line
+
+    def render(self, force=False):
+        """ Draw the status line, unless it was drawn too recently.
+        :param force: Draw even if it was drawn recently.
+        """
+        with self._lock:
+            now = time_now()
+            if now - self._last_render < self.interval and not force:
+                return
+            self._last_render = now
+            if self.is_tty:
+                self.stream.write("\r\033[K" + self.status())
+            else:
+                self.stream.write(self.status() + "\n")
+            self.stream.flush()
+
+    def finish(self):
+        """ Draw the final status, and end the status line. """
+        self.render(force=True)
+        if self.is_tty:
+            self.stream.write("\n")
+
+    def listen(self, events):
+        """ Handle events from a queue until None is received. Run in a thread.
+        :param events: multiprocessing Queue.
+        """
+        for event in iter(events.get, None):
+            self.handle(event)
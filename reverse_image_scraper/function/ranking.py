@@ -0,0 +1,137 @@
+# Standard library imports
+import os
+import re
+import json
+from math import log2
+from urllib.parse import urlparse
+
+# Local imports
+from . import image_control
+
+# Gather this many times more candidates than will be probed, so the best ones can be picked
+CANDIDATE_POOL = 3
+
+# Hosts that usually serve originals rather than thumbnails
+HIGH_RES_HOSTS = ("wikimedia.org", "staticflickr.com", "artstation.com", "deviantart.net", "pinimg.com",
+                  "imgur.com", "redd.it", "unsplash.com", "pixiv.net", "wallpaperaccess.com")
+
+# Words in a URL suggesting a shrunken copy
+THUMBNAIL_HINTS = ("thumb", "small", "preview", "icon", "avatar", "tiny", "mini")
+
+# Lossless images are more likely to be originals
+EXTENSION_SCORES = {".png": 1.0, ".webp": 0.5, ".jpeg": 0.5, ".jpg": 0.5}  # GIFs are often small
+if image_control.AVIF_SUPPORTED:
+    EXTENSION_SCORES[".avif"] = 0.5
+
+HISTORY_HOSTS = 5000  # Hosts kept in the history. It is sent to every worker with each search
+
+DIMENSIONS_PATTERN = re.compile(r'(\d{3,5})[x_-](\d{3,5})', re.IGNORECASE)  # e.g. photo-1920x1080.jpg
+WIDTH_PATTERN = re.compile(r'[?&/_-](?:w|width|size|s)[=_-]?(\d{3,5})\b', re.IGNORECASE)  # e.g. ?w=2048
+
+
+def host_of(url):
+    """ Get the host of a URL without any 'www.' prefix.
+    :param url: Web address.
+    :return: Host name, or "" if there is none.
+    """
+    host = urlparse(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def size_hint(url):
+    """ Estimate the pixel count of an image from its URL.
+    :param url: Web address of the image.
+    :return: Estimated pixels, or None if the URL gives no hint.
+    """
+    dimensions = DIMENSIONS_PATTERN.findall(url)
+    if dimensions:
+        return max(int(width) * int(height) for width, height in dimensions)
+    widths = WIDTH_PATTERN.findall(url)
+    if widths:
+        width = max(int(width) for width in widths)
+        return width * width * 3 // 4  # Assume a 4:3 image
+    return None
+
+
+def score_link(url, history=None):
+    """ Score how likely a link is to be a large copy of an image. Higher is better.
+    :param url: Web address of the image.
+    :param history: Dictionary of host to [saved, tried] counts from previous runs.
+    :return: Score as a float.
+    """
+    lower = url.lower()
+    score = 0.0
+
+    pixels = size_hint(url)
+    if pixels:
+        score += log2(pixels) - 20  # About 0 for a 1 megapixel image, +2 for 4 megapixels
+    if any(hint in lower for hint in THUMBNAIL_HINTS):
+        score -= 2
+    host = host_of(url)
+    if host.endswith(HIGH_RES_HOSTS):
+        score += 1
+    score += EXTENSION_SCORES.get(lower[lower.rfind("."):], 0)
+
+    if history:
+        saved, tried = history.get(host, (0, 0))
+        score += 4 * ((saved + 1) / (tried + 2) - 0.5)  # Smoothed success rate. Unknown hosts score 0
+    return score
+
+
+def rank_links(links, history=None):
+    """ Order links from most to least promising. Ties keep their page order.
+    :param links: List of URLs.
+    :param history: Dictionary of host to [saved, tried] counts from previous runs.
+    :return: A sorted list of URLs.
+    """
+    return sorted(links, key=lambda link: -score_link(link, history))
+
+
+def load_history(path):
+    """ Read the outcomes of previous runs. Workers append one line per probed link, so the file is compacted
+    to one line of totals per host, keeping the HISTORY_HOSTS most tried hosts. Only called before workers start.
+    :param path: Location of the history file.
+    :return: Dictionary of host to [saved, tried] counts.
+    """
+    history = {}
+    lines = 0
+    try:
+        with open(path, "r") as file:
+            for line in file:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                    counts = history.setdefault(entry["host"], [0, 0])
+                except (ValueError, KeyError, TypeError):  # Partially written line
+                    continue
+                if "tried" in entry:  # Totals from an earlier compaction
+                    counts[0] += entry.get("saved", 0)
+                    counts[1] += entry["tried"]
+                else:  # One probed link
+                    counts[0] += 1 if entry.get("saved") else 0
+                    counts[1] += 1
+    except FileNotFoundError:  # First run
+        return history
+
+    if len(history) > HISTORY_HOSTS:
+        kept = sorted(history, key=lambda host: -history[host][1])[:HISTORY_HOSTS]
+        history = {host: history[host] for host in kept}
+    if lines > len(history):
+        temporary = path + ".part"
+        with open(temporary, "w") as file:
+            file.write("".join(json.dumps({"host": host, "saved": saved, "tried": tried}) + "\n"
+                               for host, (saved, tried) in history.items()))
+        os.replace(temporary, path)  # Readers never see a partial file
+    return history
+
+
+def record_history(path, outcomes):
+    """ Append the outcome of each probed link, in a single write so processes don't interleave lines.
+    :param path: Location of the history file.
+    :param outcomes: List of (url, saved) tuples.
+    """
+    if not outcomes:
+        return
+    lines = "".join(json.dumps({"host": host_of(url), "saved": saved}) + "\n" for url, saved in outcomes)
+    with open(path, "a") as file:
+        file.write(lines)
@@ -0,0 +1,75 @@
+""" Order of searches. In a time-boxed run, the searches most likely to find larger copies go first:
+small images before large ones, and images that found nothing before go last.
+"""
+# Standard library imports
+import os
+
+# Third party imports
+from PIL import Image, UnidentifiedImageError
+
+# Local imports
+from . import os_control
+
+
+def load_no_results(path):
+    """ Read the images whose searches found nothing larger in previous runs.
+    :param path: Location of the file.
+    :return: Dictionary of file size to a set of contents hashes.
+    """
+    no_results = {}
+    try:
+        with open(path, "r") as file:
+            for line in file:
+                digest, _, size = line.strip().partition(" ")
+                if line.endswith("\n") and len(digest) == 40 and size.isdigit():  # Skips partially written lines
+                    no_results.setdefault(int(size), set()).add(digest)
+    except FileNotFoundError:  # First run
+        pass
+    return no_results
+
+
+def record_no_results(path, entries):
+    """ Append images that found nothing, in a single write so processes don't interleave lines.
+    :param path: Location of the file.
+    :param entries: List of (hash from `os_control.file_hash`, file size) tuples.
+    """
+    if entries:
+        with open(path, "a") as file:
+            file.write("".join("%s %d\n" % (digest, size) for digest, size in entries))
+
+
+def image_size(path):
+    """ Get the dimensions of an image from its header, without decoding it.
+    :param path: Location of image on file.
+    :return: Width and height, or None if it can't be read.
+    """
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except (OSError, UnidentifiedImageError):
+        return None
+
+
+def schedule(directory, groups, skip_above=0, no_results=None):
+    """ Order searches by expected benefit: images that found nothing before last, then smallest first.
+    Images that can't be read go last, as their searches are expected to fail.
+    :param directory: Folder holding the images.
+    :param groups: List of (filename, [identical filenames]) from `os_control.group_duplicates`.
+    :param skip_above: Skip images whose longest side is at least this many pixels. 0 to search all.
+    :param no_results: Dictionary from `load_no_results`. Only images the same size as one in it are hashed.
+    :return: Tuple of the ordered groups to search, and the skipped groups.
+    """
+    keyed = []
+    skipped = []
+    for position, (filename, duplicates) in enumerate(groups):
+        path = os_control.join_dir(directory, filename)
+        size = image_size(path)
+        if size is not None and skip_above and max(size) >= skip_above:
+            skipped.append((filename, duplicates))
+            continue
+        pixels = size[0] * size[1] if size is not None else float("inf")
+        same_size = no_results.get(os.path.getsize(path), ()) if no_results else ()
+        tried = bool(same_size) and os_control.file_hash(path) in same_size
+        keyed.append(((tried, pixels, position), (filename, duplicates)))  # Position keeps ties in order
+    keyed.sort(key=lambda item: item[0])
+    return [group for _, group in keyed], skipped
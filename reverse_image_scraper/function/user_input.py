@@ -40,3 +40,30 @@ def file_img_size(abs_path):
     width, height = img.size  # Save relevant data
     img.close()
     return width, height
+
+
+def has_flag(args, name):
+    """ Checks if a word was given on the command line, with or without leading dashes.
+    :param args: Command line arguments (usually sys.argv[1:]).
+    :param name: Word to look for.
+    :return: Boolean.
+    """
+    return any(arg.lstrip("-") == name for arg in args)
+
+
+def argument_value(args, name, default):
+    """ Reads a `name=value` setting from the command line.
+    :param args: Command line arguments (usually sys.argv[1:]).
+    :param name: Name of the setting.
+    :param default: Value used if the setting is missing or invalid. Its type is used to convert the value.
+    :return: The setting's value.
+    """
+    for arg in args:
+        key, _, value = arg.lstrip("-").partition("=")
+        if key == name and value:
+            try:
+                return type(default)(value)
+            except ValueError:  # e.g. 'stop=three'
+                print(cc.RED + "Invalid value for " + name + ": '" + value + "'. Using "
+                      + str(default) + "." + cc.RESET)
+    return default
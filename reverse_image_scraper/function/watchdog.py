@@ -0,0 +1,86 @@
+# Standard library imports
+import os
+from time import time as time_now
+
+# Third party imports
+import psutil
+
+# Command line switch tagging the browsers a run launches. Browsers ignore switches they don't know
+RUN_SWITCH = "--reverse-image-scraper-run="
+
+
+def process_memory(pid=None):
+    """ Resident memory of a process, including every process it started (e.g. a rendering browser).
+    :param pid: Process to measure. Defaults to the current process.
+    :return: Memory in bytes, or 0 if the process no longer exists.
+    """
+    try:
+        process = psutil.Process(pid)
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):  # Child exited while measuring
+                continue
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return 0
+    return total
+
+
+def browser_args(run_id):
+    """ Arguments for launching a rendering browser, tagged with the run it belongs to.
+    :param run_id: Identifier of the run, from `new_run_id`.
+    :return: List of command line arguments.
+    """
+    return ["--no-sandbox", RUN_SWITCH + run_id]  # --no-sandbox is the requests_html default
+
+
+def new_run_id():
+    """ Identifier telling this run's browsers apart from those of other runs and programs.
+    :return: String.
+    """
+    return "%d-%d" % (os.getpid(), int(time_now() * 1000))
+
+
+def is_browser(process, run_id):
+    """ Checks whether a process is the main process of a rendering browser launched by a run (not one of
+    its helpers).
+    :param process: psutil.Process to check.
+    :param run_id: Identifier of the run.
+    :return: Boolean.
+    """
+    try:
+        cmdline = process.cmdline()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return False
+    return RUN_SWITCH + run_id in cmdline and not any(arg.startswith("--type=") for arg in cmdline)  # Helpers
+
+
+def run_browsers(run_id):
+    """ Finds the rendering browsers launched by a run.
+    :param run_id: Identifier of the run.
+    :return: List of psutil.Process.
+    """
+    return [process for process in psutil.process_iter() if is_browser(process, run_id)]
+
+
+def kill_orphaned_browsers(run_id):
+    """ Kills a run's rendering browsers along with their helper processes. Only called while none of the
+    run's workers are alive, so every browser left is orphaned: it is never closed and leaks memory.
+    :param run_id: Identifier of the run.
+    :return: Number of browsers killed.
+    """
+    count = 0
+    for browser in run_browsers(run_id):
+        try:
+            processes = browser.children(recursive=True) + [browser]
+        except psutil.NoSuchProcess:
+            continue
+        for process in processes:
+            try:
+                process.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        psutil.wait_procs(processes, timeout=3)
+        count += 1
+    return count
@@ -1,6 +1,8 @@
 # Standard library imports
+import os
 import re
 from io import BytesIO
+from functools import lru_cache
 
 # Third party imports
 from bs4 import BeautifulSoup
@@ -9,13 +11,24 @@ from PIL import Image, UnidentifiedImageError
 from requests.exceptions import ConnectionError
 
 # Local imports
+from . import progress
+from . import image_control
 from ..common.colors import ColorCodes as cc
 
+# Gets any link that ends in an image format. Rejects any link that contains a: \ [ ] { } < > %
+IMG_EXTENSIONS = "jpg|jpeg|png|webp|gif" + ("|avif" if image_control.AVIF_SUPPORTED else "")  # Only readable ones
+IMG_LINK_PATTERN = re.compile(rb'http[^\\{}\[\]<>%]*\.(?:' + IMG_EXTENSIONS.encode() + rb')', re.IGNORECASE)
+SCRIPT_PATTERN = re.compile(rb'<script\b[^>]*>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
 
-def send_image(session, path):
+SNIFF_BYTES = 4096  # Size of the first chunk of a download, checked before the rest is downloaded
+REJECTED_TYPES = ("text/", "application/json", "application/xml", "application/xhtml")  # e.g. error pages
+
+
+def send_image(session, path, data=None):
     """ Takes a image saved on file, uploads it to google images, and saves the resulting URL.
     :param session: HTML session to access the internet.
     :param path: Location of image on file.
+    :param data: JPEG bytes to upload in place of the file (e.g. a shrunken copy), or None to upload the file.
     :return: Header URL of the resulting web page, or None if the image is too large.
     """
     try:
@@ -23,7 +36,10 @@ def send_image(session, path):
         url = "http://www.google.com/searchbyimage/upload"
 
         # Send binary data to url
-        multipart = {'encoded_image': (path, open(path, 'rb')), 'image_content': ''}
+        if data is None:
+            multipart = {'encoded_image': (path, open(path, 'rb')), 'image_content': ''}
+        else:
+            multipart = {'encoded_image': (os.path.splitext(path)[0] + ".jpg", data), 'image_content': ''}
         request = session.post(url, files=multipart, allow_redirects=False)
 
         # Get the new destination url
@@ -101,10 +117,116 @@ def img_links_from_href(request, strainer, num_links):
     soup_str = str(soup)  # Convert soup to string
 
     # Gets any link that ends in an image format. Rejects any link that contains a: \ [ ] { } < > %
-    snipped = re.findall('http[^\\\\{}\\[\\]<>%]*\\.(?:jpg|jpeg|png)', soup_str, re.IGNORECASE)
+    snipped = re.findall('http[^\\\\{}\\[\\]<>%]*\\.(?:' + IMG_EXTENSIONS + ')', soup_str, re.IGNORECASE)
     return snipped[:num_links]  # Return limited number of results.
 
 
+def get_page_bytes(session, url):
+    """ Renders a web page, including the javascript, without building a BeautifulSoup tree.
+    :param session: HTML session to access the internet.
+    :param url: Web address to page.
+    :return: The page as bytes.
+    """
+    request = session.get(url)
+    request.html.render()
+    progress.emit("bytes", len(request.content))
+    return request.content
+
+
+@lru_cache(maxsize=None)
+def href_pattern(text):
+    """ Compiles a pattern matching a link whose text is exactly `text`.
+    :param text: Link text to search for.
+    :return: Compiled bytes pattern. Group 2 holds the href.
+    """
+    return re.compile(rb'<a\b[^>]*?\shref=(["\'])([^"\'<>]*)\1[^>]*>' + re.escape(text.encode("utf-8")) + rb'</a>',
+                      re.IGNORECASE)  # The href can't contain quotes or brackets, so it never runs into other tags
+
+
+def href_from_bytes(session, data, text):
+    """ Find the link around some text in a raw HTML page, and load the page it points to.
+    Scans the bytes directly, so no tree is built.
+    :param session: HTML session to access the internet.
+    :param data: HTML page as bytes.
+    :param text: String to search for.
+    :return: Request of the linked web page, or None if nothing exists.
+    """
+    if text == "" or text is None:  # Can't get info from something that doesn't exist
+        return None
+
+    match = href_pattern(text).search(data)
+    if match is None:  # The text may not exist in the page, or exist at all.
+        return None
+    find_href = match.group(2).decode("utf-8", "replace")
+    url = "https://www.google.com" + find_href.replace("amp;", "")  # Fix abstracted url to be use-able.
+    request = session.get(url)
+    request.html.render()  # Get the requests page, loading javascript
+    progress.emit("bytes", len(request.content))
+    return request
+
+
+def img_links_from_bytes(data, num_links):
+    """ Find all URLs in the page's scripts that end in a image extension. Stops once enough are found.
+    :param data: HTML page as bytes.
+    :param num_links: Limit on the number of links to be returned. Expected to be a positive value.
+    :return: A list of URLs
+    """
+    links = []
+    for script in SCRIPT_PATTERN.finditer(data):
+        for match in IMG_LINK_PATTERN.finditer(script.group(1)):
+            if len(links) >= num_links:
+                return links
+            links.append(match.group().decode("utf-8", "replace"))
+    return links
+
+
+def sniff_format(data):
+    """ Identify an image format from the first bytes of a file, without decoding it.
+    :param data: Start of the file (at least 12 bytes).
+    :return: Format name as used by PIL (e.g. "JPEG"), or None if it isn't a supported image.
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "GIF"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "WEBP"
+    if data[4:12] in (b"ftypavif", b"ftypavis") and image_control.AVIF_SUPPORTED:  # Otherwise dropped before downloading
+        return "AVIF"
+    return None
+
+
+def is_image_type(content_type):
+    """ Checks a Content-Type header is worth downloading. Servers often mislabel images, so only types
+    that are clearly not images (e.g. HTML error pages) are refused.
+    :param content_type: Value of the header, or None if missing.
+    :return: Boolean.
+    """
+    return not (content_type or "").lower().startswith(REJECTED_TYPES)
+
+
+def is_complete(data, img_format):
+    """ Checks an image's data wasn't cut short, and its structure is sound, without decoding its pixels.
+    :param data: Whole file.
+    :param img_format: Format from `sniff_format`.
+    :return: Boolean.
+    """
+    # PIL's checks miss cut off JPEGs and GIFs. Markers can't appear inside JPEG image data, but files may
+    # carry extra data after the end marker, or a thumbnail with markers of its own before the image
+    if img_format == "JPEG" and data.rfind(b"\xff\xd9") <= data.rfind(b"\xff\xda"):
+        return False  # Image data (after the last start of scan marker) is never ended
+    if img_format == "GIF" and not data.rstrip(b"\x00").endswith(b";"):
+        return False  # Missing the trailer byte
+    try:
+        with Image.open(BytesIO(data)) as img:
+            img.verify()  # Checks structure (e.g. PNG and WebP lengths and checksums), not pixels
+    except (UnidentifiedImageError, DecompressionBombError, OSError, SyntaxError, ValueError):
+        return False
+    return True
+
+
 def img_size(session, url):
     """ Get image size from a web image
     :param session: HTML session to access the internet.
@@ -114,12 +236,25 @@ def img_size(session, url):
     err = None
     try:
         # Get status code
-        request = session.get(url)
+        request = session.get(url, stream=True)  # Only the headers so far
         if request.status_code == 403:  # Forbidden error
             err = 403
 
-        data = request.content
-        img = Image.open(BytesIO(data))
+        with request:  # Closing early drops the rest of the download
+            if not is_image_type(request.headers.get("Content-Type")):
+                return None, -1, -1, err
+            chunks = request.iter_content(SNIFF_BYTES)
+            data = next(chunks, b"")
+            img_format = sniff_format(data)
+            if img_format is None:  # e.g. an error page sent as an image
+                progress.emit("bytes", len(data))
+                return None, -1, -1, err
+            data += b"".join(chunks)
+        progress.emit("bytes", len(data))
+
+        if not is_complete(data, img_format):
+            return None, -1, -1, err
+        img = Image.open(BytesIO(data))  # Only reads the header. Pixels are decoded when saved
         width, height = img.size
         return img, width, height, err
     except (UnidentifiedImageError, ConnectionError, DecompressionBombError):
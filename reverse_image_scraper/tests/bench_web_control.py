@@ -0,0 +1,72 @@
+""" Micro-benchmark of image link extraction: BeautifulSoup trees against scanning raw bytes.
+
+Run from the program's root directory with: `python -m reverse_image_scraper.tests.bench_web_control`
+"""
+# Standard library imports
+from timeit import timeit
+
+# Third party imports
+from bs4 import SoupStrainer
+
+# Local imports
+from ..function import web_control
+
+
+def make_page(scripts=200, links_per_script=20, filler=2000):
+    """ Builds a page shaped like a Google "All sizes" result page.
+    :param scripts: Number of script elements.
+    :param links_per_script: Number of image links inside each script.
+    :param filler: Number of unrelated elements.
+    :return: HTML page as bytes.
+    """
+    parts = ["<html><head><title>Results</title></head><body>"]
+    for i in range(filler):
+        parts.append('<div class="r%d"><a href="/url?q=%d&amp;sa=U">Result %d</a><span>text</span></div>' % (i, i, i))
+    parts.append('<span class="gl"><a href="/search?tbs=simg&amp;q=x">All sizes</a></span>')
+    for i in range(scripts):
+        urls = ",".join('["https://img%d.example.com/photos/%d-%d.jpg",1080,1920]' % (i % 7, i, j)
+                        for j in range(links_per_script))
+        parts.append("<script>AF_initDataCallback({data:[%s,{\"k\":\"v\"}]});</script>" % urls)
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+class Response:
+    """ Stands in for a rendered request. """
+
+    def __init__(self, data):
+        self.content = data
+        self.text = data.decode("utf-8")
+
+
+def soup_path(request, num_links):
+    """ The previous extraction: strain to the 'All sizes' span, then stringify the scripts for a regex.
+    :return: Tuple of the 'All sizes' href and the image links.
+    """
+    soup = web_control.request_to_bs4(SoupStrainer('span', {'class', 'gl'}), request)
+    href = soup.find(string="All sizes").parent.get("href")
+    return href, web_control.img_links_from_href(request, SoupStrainer('script'), num_links)
+
+
+def bytes_path(request, num_links):
+    """ The byte scanning extraction, with the href unescaped as `href_from_bytes` does.
+    :return: Tuple of the 'All sizes' href and the image links.
+    """
+    href = web_control.href_pattern("All sizes").search(request.content).group(2).decode("utf-8")
+    return href.replace("amp;", ""), web_control.img_links_from_bytes(request.content, num_links)
+
+
+def main(number=20, num_links=50):
+    request = Response(make_page())
+    assert soup_path(request, num_links) == bytes_path(request, num_links)  # Both must agree before timing
+
+    soup_time = timeit(lambda: soup_path(request, num_links), number=number) / number
+    bytes_time = timeit(lambda: bytes_path(request, num_links), number=number) / number
+    print("Page size:     %d KB" % (len(request.content) // 1024))
+    print("BeautifulSoup: %.2f ms" % (soup_time * 1000))
+    print("Raw bytes:     %.2f ms" % (bytes_time * 1000))
+    print("Speed-up:      %.0fx" % (soup_time / bytes_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Standard library imports
+from unittest.mock import patch
+
+# Local imports
+from ..function import autotune
+
+
+def make_tuner(times, memory=50.0, **kwargs):
+    """ Builds a tuner whose clock returns `times` in order, with a fixed memory reading. """
+    with patch(autotune.__name__ + ".time_now", side_effect=[0.0]):
+        tuner = autotune.Autotuner(**kwargs)
+    clock = patch(autotune.__name__ + ".time_now", side_effect=times)
+    mem = patch(autotune.__name__ + ".psutil.virtual_memory", **{"return_value.percent": memory})
+    return tuner, clock, mem
+
+
+def test_autotuner__clamps_start_to_bounds():
+    assert autotune.Autotuner(start=10, lower=1, upper=4).level == 4
+    assert autotune.Autotuner(start=0, lower=2, upper=4).level == 2
+    assert autotune.Autotuner(start=3, lower=0, upper=0).level == 1     # Always at least one worker
+
+
+def test_autotuner__waits_for_full_window():
+    tuner, clock, mem = make_tuner([], start=2, lower=1, upper=8, min_window=4)
+    with clock, mem:
+        changed = [tuner.record(1.0, False) for _ in range(3)]
+
+    assert not any(changed)
+    assert tuner.level == 2
+
+
+def test_autotuner__climbs_while_throughput_rises():
+    # Window end, then new window start, for each of two windows
+    tuner, clock, mem = make_tuner([4.0, 4.0, 6.0, 6.0], start=2, lower=1, upper=8, min_window=4)
+    with clock, mem:
+        for _ in range(4):
+            tuner.record(1.0, False)     # 4 searches in 4 seconds
+        assert tuner.level == 3
+        for _ in range(4):
+            tuner.record(1.0, False)     # 4 searches in 2 seconds
+    assert tuner.level == 4
+
+
+def test_autotuner__steps_down_when_throughput_falls():
+    tuner, clock, mem = make_tuner([2.0, 2.0, 10.0, 10.0], start=4, lower=1, upper=8, min_window=4)
+    with clock, mem:
+        for _ in range(4):
+            tuner.record(1.0, False)
+        assert tuner.level == 5
+        for _ in range(5):
+            tuner.record(1.0, False)     # Slower than the previous window
+    assert tuner.level == 4
+
+
+def test_autotuner__backs_off_on_errors():
+    tuner, clock, mem = make_tuner([1.0, 1.0], start=8, lower=1, upper=8, min_window=4)
+    with clock, mem:
+        for i in range(8):
+            changed = tuner.record(1.0, i % 2 == 0)
+
+    assert changed is True
+    assert tuner.level == 4
+    assert "error" in tuner.reason
+
+
+def test_autotuner__backs_off_on_memory():
+    tuner, clock, mem = make_tuner([1.0, 1.0], memory=95.0, start=6, lower=1, upper=8, min_window=4)
+    with clock, mem:
+        for _ in range(6):
+            tuner.record(1.0, False)
+
+    assert tuner.level == 3
+    assert "memory" in tuner.reason
+
+
+def test_autotuner__backs_off_on_latency():
+    tuner, clock, mem = make_tuner([1.0, 1.0, 2.0, 2.0], start=4, lower=1, upper=8, min_window=4)
+    with clock, mem:
+        for _ in range(4):
+            tuner.record(1.0, False)
+        for _ in range(5):
+            tuner.record(5.0, False)     # Searches now take five times as long
+
+    assert tuner.level == 4
+    assert "latency" in tuner.reason
+
+
+def test_autotuner__never_leaves_bounds():
+    tuner, clock, mem = make_tuner([1.0, 1.0], memory=95.0, start=1, lower=1, upper=8, min_window=4)
+    with clock, mem:
+        for _ in range(4):
+            changed = tuner.record(1.0, True)
+
+    assert changed is False
+    assert tuner.level == 1
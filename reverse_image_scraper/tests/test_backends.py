@@ -0,0 +1,106 @@
+# Standard library imports
+from io import BytesIO
+from unittest.mock import patch, MagicMock
+
+# Third party imports
+import pytest
+from PIL import Image
+
+# Local imports
+from ..function import backends
+from ..function import os_control
+
+
+def image_bytes(size=(20, 10), img_format="PNG"):
+    buffer = BytesIO()
+    Image.new(mode="RGB", size=size).save(buffer, img_format)
+    return buffer.getvalue()
+
+
+def make_fixtures(tmp_path):
+    """ Fixture folder with one recorded search, for the image 'input.png' """
+    source = tmp_path / "input.png"
+    source.write_bytes(image_bytes())
+    (tmp_path / "fixtures" / "pages").mkdir(parents=True)
+    (tmp_path / "fixtures" / "images").mkdir()
+
+    page = b'<script>["https://a.com/big.png",800,400] ["https://b.com/missing.jpg",100,50]</script>'
+    (tmp_path / "fixtures" / "pages" / (os_control.file_hash(str(source)) + ".html")).write_bytes(page)
+    (tmp_path / "fixtures" / "images" / backends.url_key("https://a.com/big.png")).write_bytes(
+        image_bytes((80, 40)))
+    return str(source), str(tmp_path / "fixtures")
+
+
+def test_fixture_backend__replays_search(tmp_path):
+    source, fixtures = make_fixtures(tmp_path)
+    backend = backends.FixtureBackend(fixtures)
+
+    handle = backend.upload(None, source)
+    page = backend.results(None, handle)
+    links = backend.candidates(page, 10)
+    assert links == ["https://a.com/big.png", "https://b.com/missing.jpg"]
+
+    img, width, height, err = backend.fetch(None, links[0])
+    assert (width, height, err) == (80, 40, None)       # Test recorded image
+    assert img.size == (80, 40)
+    assert backend.fetch(None, links[1]) == (None, -1, -1, None)        # Test candidate without a recording
+
+
+def test_fixture_backend__no_results(tmp_path):
+    source, fixtures = make_fixtures(tmp_path)
+    other = tmp_path / "other.png"
+    other.write_bytes(image_bytes((30, 30)))
+
+    assert backends.FixtureBackend(fixtures).upload(None, str(other)) is None
+
+
+@patch(backends.__name__ + ".web_control")
+def test_google_backend__uses_web_control(mock_web_control):
+    mock_web_control.send_image.return_value = "https://google.com/results"
+    mock_web_control.href_from_bytes.return_value = MagicMock(content=b"sizes page")
+    mock_web_control.img_links_from_bytes.return_value = ["https://a.com/a.png"]
+    backend = backends.GoogleBackend()
+
+    assert backend.upload("session", "a.png", b"data") == "https://google.com/results"
+    mock_web_control.send_image.assert_called_once_with("session", "a.png", b"data")
+    assert backend.results("session", "https://google.com/results") == b"sizes page"
+    mock_web_control.href_from_bytes.assert_called_once_with(
+        "session", mock_web_control.get_page_bytes.return_value, "All sizes")
+    assert backend.candidates(b"sizes page", 5) == ["https://a.com/a.png"]
+    mock_web_control.img_links_from_bytes.assert_called_once_with(b"sizes page", 5)
+
+    mock_web_control.href_from_bytes.return_value = None
+    assert backend.results("session", "https://google.com/results") is None     # Test no sizes link
+
+
+@patch(backends.__name__ + ".GoogleBackend")
+def test_recording_backend__records_for_replay(mock_google, tmp_path):
+    source = tmp_path / "input.png"
+    source.write_bytes(image_bytes())
+    google = mock_google.return_value
+    google.upload.return_value = "https://google.com/results"
+    google.results.return_value = b'<script>["https://a.com/big.png",800,400]</script>'
+    google.fetch.return_value = Image.open(BytesIO(image_bytes((80, 40)))), 80, 40, None
+
+    recorder = backends.RecordingBackend(str(tmp_path / "fixtures"))
+    page = recorder.results(None, recorder.upload(None, str(source)))
+    recorder.fetch(None, recorder.candidates(page, 10)[0])
+
+    replay = backends.FixtureBackend(str(tmp_path / "fixtures"))
+    handle = replay.upload(None, str(source))
+    assert replay.results(None, handle) == page
+    assert replay.fetch(None, "https://a.com/big.png")[1:] == (80, 40, None)
+
+
+def test_get_backend(tmp_path):
+    assert type(backends.get_backend("google")) is backends.GoogleBackend
+    assert type(backends.get_backend("fixture", str(tmp_path))) is backends.FixtureBackend
+    assert type(backends.get_backend("record", str(tmp_path / "new"))) is backends.RecordingBackend
+    assert (tmp_path / "new" / "pages").is_dir()
+
+    with pytest.raises(SystemExit):
+        backends.get_backend("fixture", str(tmp_path / "missing"))     # Test missing folder
+    with pytest.raises(SystemExit):
+        backends.get_backend("fixture")     # Test no folder given
+    with pytest.raises(SystemExit):
+        backends.get_backend("bing")        # Test unknown name
@@ -0,0 +1,81 @@
+# Standard library imports
+import os
+from unittest.mock import patch
+
+# Local imports
+from ..function import extract
+
+DEFAULT = "(-) Default Results"
+
+
+def make_output(tmp_path, folders):
+    """ Builds an output folder. `folders` maps folder names to lists of file names. """
+    output = tmp_path / "output"
+    (output / DEFAULT).mkdir(parents=True)
+    for folder, files in folders.items():
+        (output / folder).mkdir()
+        for name in files:
+            (output / folder / name).write_text(folder + name)
+    return output
+
+
+def test_count_files__stops_at_limit(tmp_path):
+    for i in range(5):
+        (tmp_path / str(i)).write_text("")
+
+    count, first = extract.count_files(str(tmp_path))
+
+    assert count == 2
+    assert first in [str(i) for i in range(5)]
+    assert extract.count_files(str(tmp_path), limit=10)[0] == 5
+
+
+def test_count_files__empty_folder(tmp_path):
+    assert extract.count_files(str(tmp_path)) == (0, None)
+
+
+def test_extract_images__moves_single_files_and_cleans_up(tmp_path):
+    output = make_output(tmp_path, {"a(jpg)": ["a.jpg"], "b(jpg)": ["b.jpg", "b2.jpg"], "c(png)": []})
+    (output / DEFAULT / "a.jpg").write_text("taken")
+
+    count = extract.extract_images(str(output), DEFAULT)
+
+    assert count == 1
+    assert sorted(os.listdir(str(output))) == [DEFAULT, "b(jpg)"]      # Test emptied folders are removed
+    assert sorted(os.listdir(str(output / DEFAULT))) == ["a(1).jpg", "a.jpg"]
+    assert (output / DEFAULT / "a(1).jpg").read_text() == "a(jpg)a.jpg"
+
+
+def test_extract_images__index_skips_unchanged_folders(tmp_path):
+    output = make_output(tmp_path, {"a(jpg)": ["a.jpg", "a2.jpg"], "b(jpg)": ["b.jpg", "b2.jpg"]})
+    index_path = str(tmp_path / "index.json")
+
+    assert extract.extract_images(str(output), DEFAULT, index_path) == 0
+    assert extract.load_index(index_path).keys() == {"a(jpg)", "b(jpg)"}
+
+    with patch(extract.__name__ + ".extract_folder") as mock_extract:
+        mock_extract.return_value = False
+        extract.extract_images(str(output), DEFAULT, index_path)
+    mock_extract.assert_not_called()                                    # Test nothing changed, so nothing scanned
+
+    os.remove(str(output / "a(jpg)" / "a2.jpg"))                        # User keeps one image
+    assert extract.extract_images(str(output), DEFAULT, index_path) == 1
+    assert os.listdir(str(output / DEFAULT)) == ["a.jpg"]
+    assert extract.load_index(index_path).keys() == {"b(jpg)"}         # Test removed folders are forgotten
+
+
+def test_update_index__records_and_forgets(tmp_path):
+    output = make_output(tmp_path, {"a(jpg)": ["a.jpg", "a2.jpg"]})
+    index = {"gone(jpg)": [1, 2]}
+
+    extract.update_index(index, str(output), "a(jpg)")
+    extract.update_index(index, str(output), "gone(jpg)")
+
+    assert index == {"a(jpg)": [os.stat(str(output / "a(jpg)")).st_mtime_ns, 2]}
+
+
+def test_load_index__damaged_index_is_empty(tmp_path):
+    (tmp_path / "index.json").write_text("{not json")
+
+    assert extract.load_index(str(tmp_path / "index.json")) == {}
+    assert extract.load_index(str(tmp_path / "missing.json")) == {}
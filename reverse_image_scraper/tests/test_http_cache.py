@@ -0,0 +1,190 @@
+# Standard library imports
+import os
+from io import BytesIO
+from unittest.mock import patch
+
+# Third party imports
+import pytest
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+# Local imports
+from ..function import http_cache
+
+
+def make_response(status, body=b"", headers=None):
+    response = Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = body
+    response.raw = BytesIO(body)
+    response.reason = "OK"
+    return response
+
+
+def make_session(tmp_path, max_bytes=1024 ** 2):
+    session = Session()
+    http_cache.install(session, str(tmp_path / "cache"), max_bytes)
+    return session
+
+
+@pytest.mark.parametrize(
+    "headers, expected_output",
+    [
+        ({"Cache-Control": "public, max-age=60"}, 60),
+        ({"Cache-Control": "max-age=60, no-cache"}, 0),
+        ({"Cache-Control": "private"}, 0),
+        ({"Expires": "Thu, 01 Jan 2026 00:10:00 GMT", "Date": "Thu, 01 Jan 2026 00:00:00 GMT"}, 600),
+        ({"Expires": "0"}, 0),
+        ({}, 0),
+    ]
+)
+def test_freshness_lifetime__reads_headers(headers, expected_output):
+    assert http_cache.freshness_lifetime(CaseInsensitiveDict(headers)) == expected_output
+
+
+@pytest.mark.parametrize(
+    "status, headers, expected_output",
+    [
+        (200, {"ETag": '"a"'}, True),
+        (200, {"Last-Modified": "Thu, 01 Jan 2026 00:00:00 GMT"}, True),
+        (200, {"Cache-Control": "max-age=60"}, True),
+        (200, {"Cache-Control": "private, max-age=0"}, False),  # Nothing to revalidate with
+        (200, {"ETag": '"a"', "Cache-Control": "no-store"}, False),
+        (404, {"ETag": '"a"'}, False),
+    ]
+)
+def test_is_cacheable__follows_headers(status, headers, expected_output):
+    assert http_cache.is_cacheable(make_response(status, headers=headers)) == expected_output
+
+
+def test_caching_adapter__serves_fresh_response_without_network(tmp_path):
+    session = make_session(tmp_path)
+
+    with patch.object(HTTPAdapter, "send") as mock_send:
+        mock_send.return_value = make_response(200, b"image", {"Cache-Control": "max-age=600"})
+        first = session.get("https://a.com/img.jpg")
+        second = session.get("https://a.com/img.jpg")
+
+    assert mock_send.call_count == 1
+    assert first.content == second.content == b"image"
+    assert second.status_code == 200
+    assert b"".join(second.iter_content(2)) == b"image"
+
+
+def test_caching_adapter__revalidates_stale_response(tmp_path):
+    session = make_session(tmp_path)
+
+    with patch.object(HTTPAdapter, "send") as mock_send:
+        mock_send.return_value = make_response(200, b"page", {"ETag": '"v1"', "Content-Encoding": "gzip"})
+        session.get("https://a.com/page")
+        mock_send.return_value = make_response(304, headers={"ETag": '"v1"', "Date": "today"})
+        response = session.get("https://a.com/page")
+
+    request = mock_send.call_args[0][0]
+    assert request.headers["If-None-Match"] == '"v1"'                 # Test a conditional GET was sent
+    assert response.status_code == 200 and response.content == b"page"
+    assert response.headers["Date"] == "today"                         # Test stored headers were refreshed
+    assert "Content-Encoding" not in response.headers                  # Test body is stored decoded
+
+
+def test_caching_adapter__revalidation_keeps_body_file(tmp_path):
+    session = make_session(tmp_path)
+
+    with patch.object(HTTPAdapter, "send") as mock_send, \
+            patch.object(http_cache.HTTPCache, "store", wraps=http_cache._caches[str(tmp_path / "cache")].store) \
+            as mock_store:
+        mock_send.return_value = make_response(200, b"page", {"ETag": '"v1"'})
+        session.get("https://a.com/page")
+        mock_send.return_value = make_response(304, headers={"ETag": '"v1"', "Date": "today"})
+        assert session.get("https://a.com/page").content == b"page"
+        assert session.get("https://a.com/page").content == b"page"
+
+    assert mock_store.call_count == 1      # Test only the first response wrote a body
+
+
+def test_caching_adapter__replaces_changed_response(tmp_path):
+    session = make_session(tmp_path)
+
+    with patch.object(HTTPAdapter, "send") as mock_send:
+        mock_send.return_value = make_response(200, b"v1", {"Last-Modified": "Mon"})
+        session.get("https://a.com/page")
+        mock_send.return_value = make_response(200, b"v2", {"Last-Modified": "Tue"})
+        assert session.get("https://a.com/page").content == b"v2"
+        mock_send.return_value = make_response(304)
+        response = session.get("https://a.com/page")
+
+    assert mock_send.call_args[0][0].headers["If-Modified-Since"] == "Tue"
+    assert response.content == b"v2"
+
+
+def test_caching_adapter__ignores_uncacheable_requests(tmp_path):
+    session = make_session(tmp_path)
+
+    with patch.object(HTTPAdapter, "send") as mock_send:
+        mock_send.return_value = make_response(200, b"x", {"Cache-Control": "max-age=600"})
+        session.post("https://a.com/upload")
+        session.post("https://a.com/upload")
+        session.get("https://a.com/stream", stream=True)
+        session.get("https://a.com/stream", stream=True)
+
+    assert mock_send.call_count == 4
+    assert os.listdir(str(tmp_path / "cache")) == []
+
+
+def make_streamed_response(body, headers):
+    response = Response()
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict(headers)
+    response.raw = HTTPResponse(body=BytesIO(body), preload_content=False)
+    response.reason = "OK"
+    return response
+
+
+def test_caching_adapter__stores_streamed_response_once_read(tmp_path):
+    session = make_session(tmp_path)
+    headers = {"Cache-Control": "max-age=600"}
+
+    with patch.object(HTTPAdapter, "send") as mock_send:
+        mock_send.return_value = make_streamed_response(b"abc" * 1000, headers)
+        with session.get("https://a.com/part", stream=True) as response:
+            next(response.iter_content(10))     # Stop part way
+        mock_send.return_value = make_streamed_response(b"abc" * 1000, headers)
+        with session.get("https://a.com/all", stream=True) as response:
+            assert b"".join(response.iter_content(10)) == b"abc" * 1000
+        response = session.get("https://a.com/all", stream=True)
+
+    assert mock_send.call_count == 2    # Test only the whole body was stored, and then served
+    assert response.content == b"abc" * 1000
+    assert len(os.listdir(str(tmp_path / "cache"))) == 2    # Test one metadata and one body file
+
+
+def test_http_cache__evicts_least_recently_used(tmp_path):
+    cache = http_cache.HTTPCache(str(tmp_path / "cache"), max_bytes=25)
+    meta = {"status": 200, "reason": "OK", "headers": {}, "stored": 0}
+
+    cache.store("https://a.com/1", meta, b"1" * 10)
+    cache.store("https://a.com/2", meta, b"2" * 10)
+    meta_one = cache._paths("https://a.com/1")[0]
+    os.utime(meta_one, (0, 0))                                         # Make 1 the oldest
+    cache.load("https://a.com/2")
+    cache.store("https://a.com/3", meta, b"3" * 10)
+
+    assert cache.load("https://a.com/1") is None
+    assert cache.load("https://a.com/2") is not None
+    assert cache.load("https://a.com/3") is not None
+
+
+def test_http_cache__limit_holds_across_processes(tmp_path):
+    directory = str(tmp_path / "cache")
+    meta = {"status": 200, "reason": "OK", "headers": {}, "stored": 0}
+    workers = [http_cache.HTTPCache(directory, max_bytes=20 * 1024) for _ in range(8)]   # One cache per process
+
+    for i in range(200):
+        workers[i % 8].store("https://a.com/%d" % i, meta, bytes(1024))
+
+    total = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+                if name.endswith(".body"))
+    assert total <= 20 * 1024 * (1 + 8 * http_cache.MEASURE_FRACTION) + 1024
@@ -0,0 +1,59 @@
+# Standard library imports
+from io import BytesIO
+
+# Third party imports
+from PIL import Image
+
+# Local imports
+from ..function import image_control
+
+
+def save_image(tmp_path, name, size, img_format, mode="RGB"):
+    path = str(tmp_path / name)
+    Image.new(mode=mode, size=size, color="purple").save(path, img_format)
+    return path
+
+
+def test_prepare_upload__small_image_is_uploaded_as_is(tmp_path):
+    path = save_image(tmp_path, "small.jpg", (200, 100), "JPEG")
+
+    assert image_control.prepare_upload(path, max_bytes=1024 ** 2, max_pixels=1000 ** 2) is None
+
+
+def test_prepare_upload__shrinks_to_pixel_budget(tmp_path):
+    path = save_image(tmp_path, "large.jpg", (4000, 2000), "JPEG")
+
+    data = image_control.prepare_upload(path, max_bytes=1024 ** 2, max_pixels=1000 * 500)
+
+    with Image.open(BytesIO(data)) as img:
+        assert img.format == "JPEG"
+        assert img.size[0] * img.size[1] <= 1000 * 500
+        assert abs(img.size[0] / img.size[1] - 2) < 0.01            # Test aspect ratio is kept
+
+
+def test_prepare_upload__shrinks_to_byte_budget(tmp_path):
+    path = save_image(tmp_path, "large.png", (1000, 1000), "PNG", mode="RGBA")
+
+    data = image_control.prepare_upload(path, max_bytes=2000, max_pixels=1000 ** 2)
+
+    assert len(data) <= 2000
+    with Image.open(BytesIO(data)) as img:
+        assert img.mode == "RGB"                                    # Test transparency is dropped for JPEG
+
+
+def test_prepare_upload__applies_exif_orientation(tmp_path):
+    path = str(tmp_path / "phone.jpg")
+    img = Image.new(mode="RGB", size=(4000, 2000), color="purple")
+    img.paste((255, 255, 0), (0, 0, 2000, 2000))    # Left half yellow
+    exif = img.getexif()
+    exif[0x0112] = 6    # Orientation: shown turned a quarter clockwise
+    img.save(path, "JPEG", exif=exif.tobytes())
+
+    data = image_control.prepare_upload(path, max_bytes=1024 ** 2, max_pixels=1000 * 500)
+
+    with Image.open(BytesIO(data)) as upload:
+        assert upload.height > upload.width     # Test upright, as shown
+        assert upload.size[0] * upload.size[1] <= 1000 * 500
+        assert max(upload.size) > 900      # Test bounds were turned too, so it isn't shrunk further
+        red, green, blue = upload.getpixel((upload.width // 2, upload.height // 4))
+        assert red > 200 and green > 200    # Test yellow half is now on top
@@ -124,18 +124,19 @@ def test_make_dir__throws_SystemExit(mock_path_exists, mock_makedirs):
         os_control.make_dir("name", "\\a\\dir\\")
 
 
-@patch(os_control.__name__ + ".os.rename")
+@patch(os_control.__name__ + ".rename_no_replace")
 def test_move_file__succeeds_move(mock_rename):
-    os_control.move_file("name", "/a/source/", "/a/destination/")
+    filename = os_control.move_file("name", "/a/source/", "/a/destination/")
 
     mock_rename.assert_called_once_with('/a/source/name', '/a/destination/name')
+    assert filename == "name"
 
 
-@patch(os_control.__name__ + ".os.rename")
+@patch(os_control.__name__ + ".rename_no_replace")
 def test_move_file__fails_move(mock_rename):
     mock_rename.side_effect = [FileExistsError, FileExistsError, FileExistsError, None]  # Simulates three files exist
 
-    os_control.move_file("name.txt", "/a/source/", "/a/destination/")
+    filename = os_control.move_file("name.txt", "/a/source/", "/a/destination/")
 
     calls = [
         call("/a/source/name.txt", "/a/destination/name.txt"),
@@ -144,3 +145,69 @@ def test_move_file__fails_move(mock_rename):
         call("/a/source/name.txt", "/a/destination/name(3).txt")
     ]
     assert mock_rename.call_args_list == calls
+    assert filename == "name(3).txt"
+
+
+@pytest.mark.parametrize(
+    "filename, expected_output",
+    [
+        ("name.txt", "name(2).txt"),
+        ("name.tar.gz", "name.tar(2).gz"),
+        ("name", "name(2)"),              # No extension
+        (".hidden", ".hidden(2)"),        # Hidden file, not an extension
+    ]
+)
+def test_numbered_name__keeps_extension(filename, expected_output):
+    assert os_control.numbered_name(filename, 2) == expected_output
+
+
+def test_rename_no_replace__moves_file(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+
+    os_control.rename_no_replace(str(tmp_path / "a.txt"), str(tmp_path / "b.txt"))
+
+    assert not (tmp_path / "a.txt").exists()
+    assert (tmp_path / "b.txt").read_text() == "a"
+
+
+def test_rename_no_replace__refuses_to_replace(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+
+    with pytest.raises(FileExistsError):
+        os_control.rename_no_replace(str(tmp_path / "a.txt"), str(tmp_path / "b.txt"))
+
+    assert (tmp_path / "a.txt").read_text() == "a"      # Test nothing was lost
+    assert (tmp_path / "b.txt").read_text() == "b"
+
+
+def test_file_hash__matches_contents(tmp_path):
+    (tmp_path / "a").write_bytes(b"same")
+    (tmp_path / "b").write_bytes(b"same")
+    (tmp_path / "c").write_bytes(b"diff")
+
+    assert os_control.file_hash(str(tmp_path / "a")) == os_control.file_hash(str(tmp_path / "b"))
+    assert os_control.file_hash(str(tmp_path / "a")) != os_control.file_hash(str(tmp_path / "c"))
+
+
+def test_group_duplicates__groups_identical_files_in_order(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"one")
+    (tmp_path / "b.jpg").write_bytes(b"two")        # Same size, different contents
+    (tmp_path / "c.jpg").write_bytes(b"one")
+    (tmp_path / "d.jpg").write_bytes(b"three")
+    (tmp_path / "e.jpg").write_bytes(b"one")
+
+    groups = os_control.group_duplicates(str(tmp_path), ["a.jpg", "b.jpg", "c.jpg", "d.jpg", "e.jpg"])
+
+    assert groups == [("a.jpg", ["c.jpg", "e.jpg"]), ("b.jpg", []), ("d.jpg", [])]
+
+
+@patch(os_control.__name__ + ".file_hash")
+def test_group_duplicates__only_hashes_files_sharing_a_size(mock_hash, tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"1")
+    (tmp_path / "b.jpg").write_bytes(b"22")
+
+    groups = os_control.group_duplicates(str(tmp_path), ["a.jpg", "b.jpg"])
+
+    assert groups == [("a.jpg", []), ("b.jpg", [])]
+    mock_hash.assert_not_called()
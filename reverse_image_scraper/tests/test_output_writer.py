@@ -0,0 +1,111 @@
+# Standard library imports
+import os
+from unittest.mock import patch
+
+# Third party imports
+from PIL import Image
+
+# Local imports
+from ..function import output_writer
+from ..function.output_writer import OutputWriter
+
+
+def make_image():
+    image = Image.new(mode="RGB", size=(20, 20))
+    image.format = "png"
+    return image
+
+
+def test_output_writer__creates_folder_only_when_needed(tmp_path):
+    writer = OutputWriter(str(tmp_path / "result"))
+
+    assert writer.commit() == []
+    assert not (tmp_path / "result").exists()       # Test nothing to write means no folder
+
+    writer.make_note("a note.txt")
+    assert (tmp_path / "result" / "a note.txt").exists()
+
+
+@patch(output_writer.__name__ + ".os.makedirs")
+def test_output_writer__creates_folder_once(mock_makedirs, tmp_path):
+    mock_makedirs.side_effect = lambda directory: os.mkdir(directory)
+    writer = OutputWriter(str(tmp_path / "result"))
+
+    writer.save_image(make_image(), "a.png")
+    writer.save_image(make_image(), "b.png")
+    writer.make_note("a note.txt")
+
+    mock_makedirs.assert_called_once_with(str(tmp_path / "result"))
+
+
+def test_output_writer__resolves_name_clashes(tmp_path):
+    (tmp_path / "result").mkdir()
+    (tmp_path / "result" / "a.png").write_text("existing")
+    writer = OutputWriter(str(tmp_path / "result"))
+
+    assert writer.save_image(make_image(), "a.png") == "a(1).png"
+    assert writer.save_image(make_image(), "a.png") == "a(2).png"
+    assert (tmp_path / "result" / "a.png").read_text() == "existing"     # Test nothing was replaced
+    assert sorted(os.listdir(str(tmp_path / "result"))) == ["a(1).png", "a(2).png", "a.png"]
+
+
+def test_output_writer__failed_save_leaves_nothing(tmp_path):
+    writer = OutputWriter(str(tmp_path / "result"))
+
+    with patch(output_writer.__name__ + ".os_control.save_image", return_value=False):
+        assert writer.save_image(make_image(), "a.png") is None
+
+    assert os.listdir(str(tmp_path / "result")) == []
+    assert writer.unique_name("a.png") == "a.png"       # Test the name was released
+
+
+def test_output_writer__note_written_once(tmp_path):
+    writer = OutputWriter(str(tmp_path / "result"))
+
+    with patch(output_writer.__name__ + ".os_control.make_note") as mock_note:
+        writer.make_note("a note.txt")
+        writer.make_note("a note.txt")
+
+    mock_note.assert_called_once_with(str(tmp_path / "result"), "a note.txt")
+
+
+def test_output_writer__commit_moves_files(tmp_path):
+    (tmp_path / "input").mkdir()
+    (tmp_path / "input" / "a.jpg").write_text("a")
+    (tmp_path / "input" / "b.jpg").write_text("b")
+    writer = OutputWriter(str(tmp_path / "result"))
+
+    writer.stage_move(str(tmp_path / "input" / "a.jpg"))
+    writer.stage_move(str(tmp_path / "input" / "b.jpg"))
+    assert (tmp_path / "input" / "a.jpg").exists()      # Test nothing moves until commit
+
+    assert writer.commit() == ["a.jpg", "b.jpg"]
+    assert os.listdir(str(tmp_path / "input")) == []
+    assert (tmp_path / "result" / "b.jpg").read_text() == "b"
+
+
+def test_output_writer__commit_without_scan_renames_on_clash(tmp_path):
+    (tmp_path / "input").mkdir()
+    (tmp_path / "input" / "a.jpg").write_text("new")
+    (tmp_path / "default").mkdir()
+    (tmp_path / "default" / "a.jpg").write_text("old")
+    writer = OutputWriter(str(tmp_path / "default"), scan=False)
+
+    writer.stage_move(str(tmp_path / "input" / "a.jpg"))
+
+    assert writer.commit() == ["a(1).jpg"]
+    assert (tmp_path / "default" / "a.jpg").read_text() == "old"
+    assert (tmp_path / "default" / "a(1).jpg").read_text() == "new"
+
+
+def test_output_writer__copy_file_and_written(tmp_path):
+    (tmp_path / "source.png").write_text("image")
+    writer = OutputWriter(str(tmp_path / "result"))
+
+    writer.save_image(make_image(), "a.png")
+    writer.make_note("a note.txt")
+    assert writer.copy_file(str(tmp_path / "source.png"), "a.png") == "a(1).png"
+
+    assert writer.written == ["a.png", "a note.txt", "a(1).png"]
+    assert (tmp_path / "result" / "a(1).png").read_text() == "image"
+    assert (tmp_path / "source.png").exists()                          # Test the source is kept
@@ -0,0 +1,95 @@
+# Standard library imports
+import os
+import pstats
+import tracemalloc
+from unittest.mock import patch
+
+# Third party imports
+import pytest
+
+# Local imports
+from ..function import profiling
+
+
+@pytest.fixture(autouse=True)
+def fresh_profiler(monkeypatch):
+    """ Each test starts as a new process would """
+    monkeypatch.setattr(profiling, "_profiler", None)
+    monkeypatch.setattr(profiling, "_searches", 0)
+    monkeypatch.setattr(profiling, "_peak", 0)
+    yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def busy_search(size):
+    data = [bytes(1024) for _ in range(size)]
+    return len(data)
+
+
+def test_profile_call__returns_and_saves(tmp_path):
+    profiling.start(str(tmp_path))
+
+    assert profiling.profile_call(str(tmp_path), False, busy_search, 10) == 10
+    assert profiling.profile_call(str(tmp_path), False, busy_search, size=20) == 20
+
+    names = os.listdir(tmp_path / profiling.WORKERS_FOLDER)
+    assert sorted(names) == [str(os.getpid()) + ".json", str(os.getpid()) + ".prof"]   # Test one file per process
+    stats = pstats.Stats(str(tmp_path / profiling.WORKERS_FOLDER / (str(os.getpid()) + ".prof")))
+    assert any(function[2] == "busy_search" and stats.stats[function][1] == 2 for function in stats.stats)
+
+
+def test_profile_call__traces_memory_without_reset_peak(tmp_path, monkeypatch):
+    monkeypatch.delattr(profiling.tracemalloc, "reset_peak", raising=False)     # As on Python 3.8
+    profiling.start(str(tmp_path))
+
+    profiling.profile_call(str(tmp_path), True, busy_search, 100)
+    profiling.profile_call(str(tmp_path), True, busy_search, 10)
+
+    assert tracemalloc.is_tracing()
+    assert 0 < profiling._peak
+    assert (tmp_path / profiling.WORKERS_FOLDER / (str(os.getpid()) + ".snapshot")).exists()
+
+
+def test_profile_call__saves_on_error(tmp_path):
+    profiling.start(str(tmp_path))
+
+    with pytest.raises(ZeroDivisionError):
+        profiling.profile_call(str(tmp_path), False, lambda: 1 / 0)
+
+    assert (tmp_path / profiling.WORKERS_FOLDER / (str(os.getpid()) + ".prof")).exists()
+
+
+def test_start__removes_previous_run(tmp_path):
+    profiling.start(str(tmp_path))
+    (tmp_path / profiling.WORKERS_FOLDER / "1.prof").write_bytes(b"old")
+
+    profiling.start(str(tmp_path))
+
+    assert os.listdir(tmp_path / profiling.WORKERS_FOLDER) == []
+
+
+def test_write_report__merges_processes(tmp_path, monkeypatch):
+    profiling.start(str(tmp_path))
+    for pid in (101, 102):  # Two workers
+        monkeypatch.setattr(profiling, "_profiler", None)
+        monkeypatch.setattr(profiling, "_searches", 0)
+        with patch(profiling.__name__ + ".os.getpid", return_value=pid):
+            profiling.profile_call(str(tmp_path), True, busy_search, 100)
+
+    written = profiling.write_report(str(tmp_path))
+
+    assert sorted(os.path.basename(path) for path in written) == sorted(
+        [profiling.STATS_FILE, profiling.REPORT_FILE, profiling.MEMORY_FILE])
+    report = (tmp_path / profiling.REPORT_FILE).read_text()
+    assert report.startswith("2 searches across 2 processes")
+    assert "busy_search" in report
+    assert "Peak traced memory of one search" in (tmp_path / profiling.MEMORY_FILE).read_text()
+
+
+def test_write_report__nothing_searched(tmp_path):
+    assert profiling.write_report(str(tmp_path)) == []      # Test no folder
+
+    profiling.start(str(tmp_path))
+    assert profiling.write_report(str(tmp_path)) == []      # Test empty folder
+    assert not (tmp_path / profiling.STATS_FILE).exists()
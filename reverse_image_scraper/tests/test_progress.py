@@ -0,0 +1,122 @@
+# Standard library imports
+import io
+import queue
+from unittest.mock import patch
+
+# Third party imports
+import pytest
+
+# Local imports
+from ..function import progress
+
+
+class TTY(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.fixture
+def clock():
+    with patch(progress.__name__ + ".time_now") as mock_time:
+        mock_time.return_value = 0.0
+        yield mock_time
+
+
+@pytest.mark.parametrize(
+    "seconds, expected_output",
+    [(0, "0m 00s"), (59.9, "0m 59s"), (125, "2m 05s"), (3600, "60m 00s")]
+)
+def test_format_duration__returns_expected_string(seconds, expected_output):
+    assert progress.format_duration(seconds) == expected_output
+
+
+@pytest.mark.parametrize(
+    "count, expected_output",
+    [(0, "0.0 B"), (1536, "1.5 KB"), (5 * 1024 ** 2, "5.0 MB"), (3 * 1024 ** 3, "3.0 GB")]
+)
+def test_format_bytes__returns_expected_string(count, expected_output):
+    assert progress.format_bytes(count) == expected_output
+
+
+def test_emit__sends_events_only_when_queue_set():
+    events = queue.Queue()
+
+    progress.emit("upload")                         # No queue, so nothing happens
+    progress.set_queue(events)
+    try:
+        progress.emit("bytes", 10)
+    finally:
+        progress.set_queue(None)
+
+    _, kind, value = events.get_nowait()
+    assert (kind, value) == ("bytes", 10)
+    assert events.empty()
+
+
+def test_dashboard__tracks_stages_bytes_and_eta(clock):
+    dashboard = progress.Dashboard(10, io.StringIO())
+
+    dashboard.handle((1, "upload", None))
+    dashboard.handle((2, "upload", None))
+    dashboard.handle((2, "render", None))
+    dashboard.handle((2, "bytes", 2048))
+    dashboard.set_waiting(6)
+    clock.return_value = 4.0
+    dashboard.complete(2)
+
+    status = dashboard.status()
+    assert "[2/10] 20%" in status
+    assert "0.50 img/s" in status and "512.0 B/s" in status
+    assert "workers 2" in status
+    assert "waiting 6 upload 1 render 1 download 0 save 0" in status
+    assert "ETA 0m 16s" in status
+
+    dashboard.handle((1, "done", None))
+    assert "workers 1" in dashboard.status()
+
+
+def test_dashboard__log_lines_are_periodic_when_not_a_tty(clock):
+    stream = io.StringIO()
+    dashboard = progress.Dashboard(10, stream, log_interval=10.0)
+
+    clock.return_value = 1.0
+    dashboard.complete(1)                           # Too soon after start for a log line
+    dashboard.handle((1, "upload", None))
+    assert stream.getvalue() == ""
+
+    clock.return_value = 11.0
+    dashboard.complete(1)
+    clock.return_value = 12.0
+    dashboard.complete(1)
+    dashboard.finish()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("[2/10]") and lines[1].startswith("[3/10]")
+    assert "\r" not in stream.getvalue() and "█" not in stream.getvalue()
+
+
+def test_dashboard__redraws_one_line_on_a_tty(clock):
+    stream = TTY()
+    dashboard = progress.Dashboard(4, stream, interval=0.25)
+
+    dashboard.complete(1)
+    dashboard.handle((1, "upload", None))           # Throttled
+    dashboard.message("hello")
+    dashboard.finish()
+
+    output = stream.getvalue()
+    assert output.count("\r\033[K") == 4            # Two draws, the message, and the final draw
+    assert "hello\n" in output
+    assert output.endswith("\n")
+
+
+def test_dashboard__listen_stops_on_none(clock):
+    events = queue.Queue()
+    for event in [(1, "upload", None), (1, "bytes", 5), (1, "done", None), None]:
+        events.put(event)
+    dashboard = progress.Dashboard(1, io.StringIO())
+
+    dashboard.listen(events)
+
+    assert dashboard.bytes == 5 and dashboard.stages == {}
@@ -0,0 +1,101 @@
+# Standard library imports
+import json
+from unittest.mock import patch
+
+# Third party imports
+import pytest
+
+# Local imports
+from ..function import ranking
+
+
+@pytest.mark.parametrize(
+    "url, expected_output",
+    [
+        ("https://www.example.com/a.jpg", "example.com"),
+        ("https://img.example.com:8080/a.jpg", "img.example.com"),
+        ("not a url", ""),
+    ]
+)
+def test_host_of__returns_expected_host(url, expected_output):
+    assert ranking.host_of(url) == expected_output
+
+
+@pytest.mark.parametrize(
+    "url, expected_output",
+    [
+        ("https://a.com/photo-1920x1080.jpg", 1920 * 1080),
+        ("https://a.com/1280_720/photo.jpg", 1280 * 720),
+        ("https://a.com/photo.jpg?w=2048", 2048 * 2048 * 3 // 4),
+        ("https://a.com/s1600/photo.jpg", 1600 * 1600 * 3 // 4),
+        ("https://a.com/photo-150.jpg", None),
+    ]
+)
+def test_size_hint__reads_dimensions_from_url(url, expected_output):
+    assert ranking.size_hint(url) == expected_output
+
+
+def test_score_link__prefers_large_hints_and_high_res_hosts():
+    assert ranking.score_link("https://a.com/photo-3840x2160.jpg") > ranking.score_link("https://a.com/photo.jpg")
+    assert ranking.score_link("https://a.com/photo.jpg") > ranking.score_link("https://a.com/thumb/photo.jpg")
+    assert ranking.score_link("https://upload.wikimedia.org/p.jpg") > ranking.score_link("https://a.com/p.jpg")
+    assert ranking.score_link("https://a.com/photo.png") > ranking.score_link("https://a.com/photo.jpg")
+
+
+def test_score_link__uses_history():
+    history = {"good.com": [9, 10], "bad.com": [0, 10]}
+
+    good = ranking.score_link("https://good.com/p.jpg", history)
+    unknown = ranking.score_link("https://new.com/p.jpg", history)
+    bad = ranking.score_link("https://bad.com/p.jpg", history)
+
+    assert good > unknown > bad
+    assert unknown == ranking.score_link("https://new.com/p.jpg")     # No history is neutral
+
+
+def test_rank_links__orders_by_score_and_keeps_ties_in_page_order():
+    links = ["https://a.com/1.jpg", "https://a.com/thumb.jpg", "https://a.com/2.jpg", "https://a.com/4000x3000.jpg"]
+
+    assert ranking.rank_links(links) == ["https://a.com/4000x3000.jpg", "https://a.com/1.jpg",
+                                         "https://a.com/2.jpg", "https://a.com/thumb.jpg"]
+
+
+def test_history__round_trips(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+
+    assert ranking.load_history(path) == {}                            # Missing file is an empty history
+    ranking.record_history(path, [("https://a.com/1.jpg", True), ("https://a.com/2.jpg", False)])
+    ranking.record_history(path, [("https://www.b.com/1.jpg", False)])
+    ranking.record_history(path, [])
+
+    assert ranking.load_history(path) == {"a.com": [1, 2], "b.com": [0, 1]}
+
+
+def test_load_history__skips_broken_lines(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_text(json.dumps({"host": "a.com", "saved": True}) + "\n" + '{"host": "b.c' + "\n[]\n")
+
+    assert ranking.load_history(str(path)) == {"a.com": [1, 1]}
+
+
+def test_load_history__compacts_to_totals(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    ranking.record_history(path, [("https://a.com/%d.jpg" % i, i % 2 == 0) for i in range(10)])
+    ranking.record_history(path, [("https://b.com/1.jpg", True)])
+
+    assert ranking.load_history(path) == {"a.com": [5, 10], "b.com": [1, 1]}
+    with open(path) as file:
+        assert len(file.readlines()) == 2       # Test one line per host
+
+    ranking.record_history(path, [("https://a.com/new.jpg", True)])     # Appended after compaction
+    assert ranking.load_history(path) == {"a.com": [6, 11], "b.com": [1, 1]}
+
+
+@patch(ranking.__name__ + ".HISTORY_HOSTS", 2)
+def test_load_history__keeps_most_tried_hosts(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    ranking.record_history(path, [("https://a.com/1.jpg", True)] * 3 + [("https://b.com/1.jpg", True)]
+                           + [("https://c.com/1.jpg", False)] * 2)
+
+    assert ranking.load_history(path) == {"a.com": [3, 3], "c.com": [0, 2]}
+    assert ranking.load_history(path) == {"a.com": [3, 3], "c.com": [0, 2]}
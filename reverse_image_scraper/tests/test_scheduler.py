@@ -0,0 +1,72 @@
+# Standard library imports
+import os
+from unittest.mock import patch
+
+# Third party imports
+from PIL import Image
+
+# Local imports
+from ..function import scheduler
+from ..function import os_control
+
+
+def make_images(tmp_path, sizes):
+    for name, size in sizes.items():
+        Image.new(mode="RGB", size=size, color=(len(name), 0, 0)).save(str(tmp_path / name))
+
+
+def test_schedule__smallest_first(tmp_path):
+    make_images(tmp_path, {"big.png": (300, 300), "small.png": (50, 40), "wide.png": (200, 5)})
+    groups = [("big.png", ["big copy.png"]), ("small.png", []), ("wide.png", [])]
+
+    ordered, skipped = scheduler.schedule(str(tmp_path), groups)
+
+    assert ordered == [("wide.png", []), ("small.png", []), ("big.png", ["big copy.png"])]
+    assert skipped == []
+
+
+def test_schedule__skips_large_images(tmp_path):
+    make_images(tmp_path, {"big.png": (300, 100), "small.png": (50, 40), "edge.png": (100, 299)})
+    groups = [("big.png", []), ("small.png", []), ("edge.png", [])]
+
+    ordered, skipped = scheduler.schedule(str(tmp_path), groups, skip_above=300)
+
+    assert ordered == [("small.png", []), ("edge.png", [])]
+    assert skipped == [("big.png", [])]
+
+
+def test_schedule__previous_failures_and_unreadable_last(tmp_path):
+    make_images(tmp_path, {"a.png": (50, 50), "b.png": (60, 60), "c.png": (70, 70)})
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+    no_results = {os.path.getsize(str(tmp_path / "a.png")): {os_control.file_hash(str(tmp_path / "a.png"))}}
+    groups = [("broken.png", []), ("a.png", []), ("b.png", []), ("c.png", [])]
+
+    ordered, skipped = scheduler.schedule(str(tmp_path), groups, skip_above=1000, no_results=no_results)
+
+    assert [filename for filename, _ in ordered] == ["b.png", "c.png", "broken.png", "a.png"]
+    assert skipped == []
+
+
+def test_no_results__round_trip(tmp_path):
+    path = str(tmp_path / ".no_results.txt")
+    assert scheduler.load_no_results(path) == {}     # Test first run
+
+    scheduler.record_no_results(path, [("a" * 40, 10)])
+    scheduler.record_no_results(path, [])
+    scheduler.record_no_results(path, [("b" * 40, 20), ("c" * 40, 10)])
+    with open(path, "a") as file:
+        file.write("d" * 40 + " 3")    # Partially written line, size cut short
+
+    assert scheduler.load_no_results(path) == {10: {"a" * 40, "c" * 40}, 20: {"b" * 40}}
+
+
+@patch(scheduler.__name__ + ".os_control.file_hash", wraps=os_control.file_hash)
+def test_schedule__only_hashes_files_matching_a_size(mock_hash, tmp_path):
+    make_images(tmp_path, {"a.png": (50, 50), "b.png": (60, 60), "c.png": (70, 70)})
+    no_results = {os.path.getsize(str(tmp_path / "b.png")): {"0" * 40}}    # Same size, other contents
+
+    ordered, _ = scheduler.schedule(str(tmp_path), [("a.png", []), ("b.png", []), ("c.png", [])],
+                                    no_results=no_results)
+
+    assert [filename for filename, _ in ordered] == ["a.png", "b.png", "c.png"]
+    mock_hash.assert_called_once_with(os_control.join_dir(str(tmp_path), "b.png"))
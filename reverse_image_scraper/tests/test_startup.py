@@ -0,0 +1,45 @@
+# Standard library imports
+import sys
+import subprocess
+
+# Local imports
+from ..function import os_control
+
+# Top level packages only needed when searching
+SCRAPING_STACK = ("requests_html", "pyppeteer", "pyquery", "bs4", "lxml", "requests", "psutil", "pytest")
+
+
+def import_times(statement):
+    """ Runs a statement in a fresh interpreter with `-X importtime`.
+    :param statement: Python code to run.
+    :return: Dictionary of module name to cumulative import time in microseconds.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=os_control.get_main_dir(),
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:  # Header line
+            continue
+    return times
+
+
+def test_app_import__skips_scraping_stack():
+    already_loaded = import_times("pass")  # e.g. site packages imported on start up
+
+    loaded = set(import_times("import reverse_image_scraper.app")) - set(already_loaded)
+
+    assert not sorted(name for name in loaded if name.split(".")[0] in SCRAPING_STACK)
+
+
+def test_app_import__benchmark():
+    app_time = import_times("import reverse_image_scraper.app")["reverse_image_scraper.app"]
+    stack_time = import_times("import reverse_image_scraper.function.web_control")[
+        "reverse_image_scraper.function.web_control"]
+
+    print("\nApp import: %.1f ms, scraping stack import: %.1f ms" % (app_time / 1000, stack_time / 1000))
+    assert app_time < stack_time
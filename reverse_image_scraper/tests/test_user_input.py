@@ -52,3 +52,34 @@ def test_file_img_size__returns_expected_dimensions(mock_image):
     mock_image.open.assert_called_once_with('a/dir/test.jpg')       # Test directory called correctly.
     mock_image.open.return_value.close.assert_called_once_with()    # Test call to close image is run.
     assert width == 42 and height == 83                             # Test values are as expected
+
+
+@pytest.mark.parametrize(
+    "args, expected_output",
+    [
+        (["single", "profile"], True),
+        (["--profile"], True),
+        (["noprofile"], False),
+        (["fixtures=/data/profile"], False),     # Part of a setting's value
+        (["fixtures=./profile_runs"], False),
+        ([], False),
+    ]
+)
+def test_has_flag__matches_whole_words(args, expected_output):
+    assert user_input.has_flag(args, "profile") == expected_output
+
+
+@pytest.mark.parametrize(
+    "args, default, expected_output",
+    [
+        (["single", "stop=3"], 0, 3),
+        (["--stop=3"], 0, 3),
+        (["stop="], 0, 0),              # Missing value, so return default
+        (["stop=three"], 0, 0),         # Not a number, so return default
+        (["stops=3"], 0, 0),            # Different setting
+        (["ratio=1.5"], 0.0, 0.0),      # Different setting
+        (["stop=1.5"], 0.0, 1.5),       # Type follows the default
+    ]
+)
+def test_argument_value__returns_correct_values(args, default, expected_output):
+    assert user_input.argument_value(args, "stop", default) == expected_output
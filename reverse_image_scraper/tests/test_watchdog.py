@@ -0,0 +1,80 @@
+# Standard library imports
+import os
+from unittest.mock import patch, MagicMock
+
+# Third party imports
+import psutil
+
+# Local imports
+from ..function import watchdog
+
+
+def make_process(cmdline, parent_name="python", rss=0):
+    process = MagicMock()
+    process.cmdline.return_value = cmdline
+    process.memory_info.return_value.rss = rss
+    if parent_name is None:
+        process.parent.return_value = None
+    else:
+        process.parent.return_value.name.return_value = parent_name
+    return process
+
+
+@patch(watchdog.__name__ + ".psutil.Process")
+def test_process_memory__includes_children(mock_process):
+    mock_process.return_value.memory_info.return_value.rss = 100
+    mock_process.return_value.children.return_value = [make_process([], rss=20), make_process([], rss=30)]
+
+    assert watchdog.process_memory(42) == 150
+    mock_process.assert_called_once_with(42)
+    mock_process.return_value.children.assert_called_once_with(recursive=True)
+
+
+@patch(watchdog.__name__ + ".psutil.Process")
+def test_process_memory__missing_process_returns_zero(mock_process):
+    mock_process.side_effect = psutil.NoSuchProcess(42)
+
+    assert watchdog.process_memory(42) == 0
+
+
+def test_browser_args__tag_run():
+    run_id = watchdog.new_run_id()
+
+    assert watchdog.browser_args(run_id) == ["--no-sandbox", watchdog.RUN_SWITCH + run_id]
+    assert run_id.startswith(str(os.getpid()) + "-")
+
+
+def test_is_browser__only_matches_main_browser_of_run():
+    tag = watchdog.RUN_SWITCH + "1-2"
+
+    assert watchdog.is_browser(make_process(["chrome", "--user-data-dir=/x/pyppeteer/p", tag]), "1-2")
+    assert not watchdog.is_browser(make_process(["chrome", "--type=renderer", tag]), "1-2")     # Test helper
+    assert not watchdog.is_browser(make_process(["chrome", watchdog.RUN_SWITCH + "1-23"]), "1-2")  # Test other run
+    assert not watchdog.is_browser(make_process(["chrome", "--user-data-dir=/x/pyppeteer/p"]), "1-2")
+
+
+@patch(watchdog.__name__ + ".psutil.process_iter")
+def test_run_browsers__ignores_other_browsers(mock_process_iter):
+    tag = watchdog.RUN_SWITCH + "1-2"
+    owned = make_process(["chrome", tag], parent_name="python3.8")     # Test parent doesn't matter
+    orphan = make_process(["chrome", tag], parent_name="systemd")
+    other_run = make_process(["chrome", "pyppeteer", watchdog.RUN_SWITCH + "3-4"], parent_name=None)
+    other_program = make_process(["chrome", "pyppeteer"], parent_name=None)
+    mock_process_iter.return_value = [owned, orphan, other_run, other_program]
+
+    assert watchdog.run_browsers("1-2") == [owned, orphan]
+
+
+@patch(watchdog.__name__ + ".psutil.wait_procs")
+@patch(watchdog.__name__ + ".run_browsers")
+def test_kill_orphaned_browsers__kills_helpers_too(mock_browsers, mock_wait):
+    helper = make_process([])
+    browser = make_process([])
+    browser.children.return_value = [helper]
+    mock_browsers.return_value = [browser]
+
+    assert watchdog.kill_orphaned_browsers("1-2") == 1
+    mock_browsers.assert_called_once_with("1-2")
+    helper.kill.assert_called_once_with()
+    browser.kill.assert_called_once_with()
+    mock_wait.assert_called_once_with([helper, browser], timeout=3)
@@ -1,16 +1,21 @@
 # Standard library imports
-from unittest.mock import patch
+from io import BytesIO
+from unittest.mock import patch, MagicMock
 
 # Third-part imports
 import pytest
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from requests_html import HTMLSession
 from PIL.Image import DecompressionBombError
-from PIL import Image, UnidentifiedImageError
+from PIL import Image
 from requests.exceptions import ConnectionError
 
 # Local imports
 from ..function import web_control
+from ..function import image_control
+from . import bench_web_control
+
+needs_avif = pytest.mark.skipif(not image_control.AVIF_SUPPORTED, reason="Pillow can't read AVIF")
 
 
 @patch(web_control.__name__ + ".open")
@@ -133,6 +138,8 @@ def test_href_from_text__empty_text_returns_none():
     [
         ("https://img.web.com/photo-150.jpg", "https://img.web.com/photo-150.jpg"),
         ("https://img.web.com/photo-150.PNG", "https://img.web.com/photo-150.PNG"),
+        ("https://img.web.com/photo-150.webp", "https://img.web.com/photo-150.webp"),
+        pytest.param("https://img.web.com/photo-150.avif", "https://img.web.com/photo-150.avif", marks=needs_avif),
         ("https://img.web.com/photo-150.jpeg", "https://img.web.com/photo-150.jpeg"),
         ("http://img.web.com.au.gov.net.nz.co/photo-150.jpg", "http://img.web.com.au.gov.net.nz.co/photo-150.jpg"),
         ("[<https://img.web.com/photo-150.jpg.[][][].jpg>]", "https://img.web.com/photo-150.jpg"),
@@ -166,28 +173,60 @@ def test_img_links_from_href__invalid_urls(soup):
     assert not lst
 
 
-@patch(web_control.__name__ + ".BytesIO")
-@patch(web_control.__name__ + ".Image.open")
-def test_img_size__succeeds(mock_Image, mock_bytes):
+def image_bytes(img_format="PNG", size=(200, 100)):
+    buffer = BytesIO()
+    Image.new(mode="RGB", size=size).save(buffer, img_format)
+    return buffer.getvalue()
+
+
+def make_download(data, status_code=200, content_type="image/png"):
+    """ Streamed response, as returned by `session.get(url, stream=True)` """
+    response = MagicMock(status_code=status_code, headers={"Content-Type": content_type} if content_type else {})
+    response.__enter__.return_value = response
+    response.iter_content.side_effect = lambda size: iter([data[i:i + size] for i in range(0, len(data), size)])
+    return response
+
+
+def test_img_size__succeeds():
     session = HTMLSession()
-    image = Image.new(mode="RGB", size=(200, 200))
-    image.format = "png"
 
     with patch.object(session, "get") as mock_session:
-        mock_Image.return_value = image
-        mock_session.return_value.content = "page_data"
-        mock_session.return_value.status_code = 403
+        mock_session.return_value = make_download(image_bytes("PNG", (200, 150)) + bytes(10000), status_code=403,
+                                                  content_type=None)   # Several chunks, some padding
+        img, width, height, err = web_control.img_size(session, "https://url.com")
 
+    assert width == 200 and height == 150 and err == 403       # Test return value is as expected
+    assert img.format == "PNG"
+    mock_session.assert_called_once_with("https://url.com", stream=True)     # Test session gets url
+
+
+@pytest.mark.parametrize("img_format", ["JPEG", "WEBP", "GIF"])
+def test_img_size__reads_other_formats(img_format):
+    session = HTMLSession()
+
+    with patch.object(session, "get") as mock_session:
+        mock_session.return_value = make_download(image_bytes(img_format), content_type="image/" + img_format)
         img, width, height, err = web_control.img_size(session, "https://url.com")
 
-    assert img is image and width == 200 and height == 200 and err == 403       # Test return value is as expected
-    mock_bytes.assert_called_once_with('page_data')                             # Test page data is passed to BytesIO
-    mock_session.assert_called_once_with('https://url.com')                     # Test session gets url
+    assert img.format == img_format and width == 200 and height == 100
+
+
+def test_img_size__rejects_pages_before_downloading():
+    session = HTMLSession()
+
+    with patch.object(session, "get") as mock_session:
+        mock_session.return_value = make_download(b"<html>Not found</html>", content_type="text/html")
+        assert web_control.img_size(session, "https://url.com") == (None, -1, -1, None)
+    mock_session.return_value.iter_content.assert_not_called()      # Test the body is never read
+
+    body = b"<html>" + bytes(20000) + b"</html>"
+    with patch.object(session, "get") as mock_session:
+        mock_session.return_value = make_download(body, content_type="image/jpeg")     # Mislabeled page
+        assert web_control.img_size(session, "https://url.com") == (None, -1, -1, None)
+    mock_session.return_value.__exit__.assert_called_once()     # Test the rest of the download is dropped
 
 
-@patch(web_control.__name__ + ".BytesIO")
-@patch(web_control.__name__ + ".Image.open")
-def test_img_size__fails(mock_Image, mock_bytes):
+def test_img_size__fails():
     session = HTMLSession()
 
     # Web error
@@ -197,12 +236,176 @@ def test_img_size__fails(mock_Image, mock_bytes):
     assert img is None and width == -1 and height == -1 and err is None
 
     # Image errors
-    with patch.object(session, "get"):
-        mock_Image.side_effect = UnidentifiedImageError
+    for data in (image_bytes("PNG")[:-100], image_bytes("JPEG")[:-100], b"\xff\xd8\xff" + bytes(100)):
+        with patch.object(session, "get") as mock_session:
+            mock_session.return_value = make_download(data)
+            img, width, height, err = web_control.img_size(session, "https://url.com")
+        assert img is None and width == -1 and height == -1 and err is None
+    with patch.object(session, "get") as mock_session, patch(web_control.__name__ + ".Image.open") as mock_open:
+        mock_session.return_value = make_download(image_bytes("PNG"))
+        mock_open.side_effect = DecompressionBombError
         img, width, height, err = web_control.img_size(session, "https://url.com")
     assert img is None and width == -1 and height == -1 and err is None
-    with patch.object(session, "get"):
-        mock_Image.side_effect = DecompressionBombError
-        img, width, height, err = web_control.img_size(session, "https://url.com")
-    assert img is None and width == -1 and height == -1 and err is None
-    assert 2 == mock_bytes.call_count   # Test the above two errors call BytesIO
+
+
+@pytest.mark.parametrize("img_format", ["JPEG", "PNG", "GIF", "WEBP", pytest.param("AVIF", marks=needs_avif)])
+def test_sniff_format__identifies_images(img_format):
+    assert web_control.sniff_format(image_bytes(img_format)[:web_control.SNIFF_BYTES]) == img_format
+
+
+def test_sniff_format__rejects_avif_without_support():
+    header = b"\x00\x00\x00\x1cftypavif" + bytes(100)
+
+    with patch(image_control.__name__ + ".AVIF_SUPPORTED", False):
+        assert web_control.sniff_format(header) is None
+
+
+@pytest.mark.parametrize("data", [b"", b"<!DOCTYPE html><html>", b"\x00" * 20, b"RIFF\x00\x00\x00\x00WAVE"])
+def test_sniff_format__rejects_other_data(data):
+    assert web_control.sniff_format(data) is None
+
+
+@pytest.mark.parametrize(
+    "content_type, expected_output",
+    [
+        ("image/jpeg", True),
+        ("application/octet-stream", True),    # Mislabeled images are still checked
+        (None, True),
+        ("text/html; charset=UTF-8", False),
+        ("TEXT/PLAIN", False),
+        ("application/json", False),
+    ]
+)
+def test_is_image_type(content_type, expected_output):
+    assert web_control.is_image_type(content_type) == expected_output
+
+
+def test_is_complete__checks_structure():
+    png = image_bytes("PNG")
+    corrupt = bytearray(png)
+    corrupt[40] ^= 0xff     # Inside the image data, so only the checksum notices
+
+    assert web_control.is_complete(png, "PNG")
+    assert not web_control.is_complete(bytes(corrupt), "PNG")
+    assert not web_control.is_complete(image_bytes("WEBP")[:-10], "WEBP")
+
+
+@needs_avif
+def test_is_complete__checks_avif():
+    assert web_control.is_complete(image_bytes("AVIF"), "AVIF")
+    assert not web_control.is_complete(image_bytes("AVIF")[:-100], "AVIF")
+
+
+def test_is_complete__checks_ends():
+    jpeg = image_bytes("JPEG")
+    gif = image_bytes("GIF")
+
+    assert web_control.is_complete(jpeg + b"trailing metadata", "JPEG")  # Test data after the end is allowed
+    assert not web_control.is_complete(jpeg[:-10], "JPEG")
+    assert not web_control.is_complete(b"\xff\xd8\xff\xd9" + jpeg[2:-10], "JPEG")  # Test earlier end (thumbnail)
+    assert web_control.is_complete(gif + bytes(8), "GIF")
+    assert not web_control.is_complete(gif[:-10], "GIF")
+
+
+def test_get_page_bytes__returns_raw_page():
+    session = HTMLSession()
+    with patch.object(session, 'get') as mock_session:
+        mock_session.return_value.content = b"some_HTML_code"
+        page = web_control.get_page_bytes(session, "http://url")
+
+    assert page == b"some_HTML_code"
+    mock_session.assert_called_once_with("http://url")
+    mock_session.return_value.html.render.assert_called_once_with()
+
+
+@pytest.mark.parametrize(
+    "page",
+    [
+        b'<span class="gl"><a href="/some/url?a=1&amp;b=2">All sizes</a></span>',
+        b"<span class='gl'><a class=\"fl\" href='/some/url?a=1&amp;b=2' ping=\"x\">All sizes</a></span>",
+        b'<a href="/url?q=1">Other</a><span class="gl"><a href="/some/url?a=1&amp;b=2">All sizes</a></span>',
+        b'<a href="/url?q=1">\nOther\n</a>\n<a\nhref="/some/url?a=1&amp;b=2">All sizes</a>',  # Earlier links
+    ]
+)
+def test_href_from_bytes__succeed_return(page):
+    session = HTMLSession()
+    with patch.object(session, 'get') as mock_session:
+        request = web_control.href_from_bytes(session, page, "All sizes")
+
+    assert request is mock_session.return_value
+    mock_session.assert_called_once_with('https://www.google.com/some/url?a=1&b=2')
+    mock_session.return_value.html.render.assert_called_once_with()
+
+
+@pytest.mark.parametrize(
+    "page, text",
+    [
+        (b'<a href="/some/url">Visually similar</a>', "All sizes"),     # Text missing
+        (b'<a href="/some/url"><b>All sizes</b></a>', "All sizes"),    # Text is not directly inside the link
+        (b'<a href="/some/url">All sizes</a>', ""),                    # No text to search for
+    ]
+)
+def test_href_from_bytes__returns_none(page, text):
+    session = HTMLSession()
+    with patch.object(session, 'get') as mock_session:
+        request = web_control.href_from_bytes(session, page, text)
+
+    assert request is None
+    mock_session.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "soup, expected_output",
+    [
+        ("https://img.web.com/photo-150.jpg", "https://img.web.com/photo-150.jpg"),
+        ("https://img.web.com/photo-150.PNG", "https://img.web.com/photo-150.PNG"),
+        ("https://img.web.com/photo-150.webp", "https://img.web.com/photo-150.webp"),
+        ("https://img.web.com/photo-150.avif",      # Only kept if it can be read
+         "https://img.web.com/photo-150.avif" if image_control.AVIF_SUPPORTED else None),
+        ("[https://\\\\1231!!2!@#534@#<https://img.web.com/photo-150.jpg.[][][].jpg>].jpg!!32#%#$.pngjpg",
+         "https://img.web.com/photo-150.jpg"),
+        ("https://img.web.{com}/photo-150.jpg", None),
+        ("https://img.web.com%/photo-150.jpg", None),
+    ]
+)
+def test_img_links_from_bytes__matches_soup_path(soup, expected_output):
+    page = ("<html><body><script>" + soup + "</script></body></html>").encode("utf-8")
+
+    lst = web_control.img_links_from_bytes(page, 10)
+
+    assert lst == ([expected_output] if expected_output else [])
+
+
+def test_img_links_from_bytes__only_searches_scripts_and_stops_early():
+    page = (b'<img src="https://img.web.com/outside.jpg">'
+            b'<script type="text/javascript">[["https://a.com/1.jpg",1],["https://a.com/2.png",2]]</script>'
+            b'<p>https://img.web.com/text.jpg</p>'
+            b'<SCRIPT>var x = "https://a.com/3.jpeg";</SCRIPT>')
+
+    assert web_control.img_links_from_bytes(page, 10) == ["https://a.com/1.jpg", "https://a.com/2.png",
+                                                          "https://a.com/3.jpeg"]
+    assert web_control.img_links_from_bytes(page, 2) == ["https://a.com/1.jpg", "https://a.com/2.png"]
+
+
+def test_img_links_from_bytes__agrees_with_img_links_from_href():
+    page = bench_web_control.make_page(scripts=20, links_per_script=5)
+    request = type("Request", (), {"text": page.decode("utf-8"), "content": page})()
+
+    expected = web_control.img_links_from_href(request, SoupStrainer("script"), 50)
+
+    assert web_control.img_links_from_bytes(page, 50) == expected
+
+
+@patch(web_control.__name__ + ".open")
+def test_send_image__sends_given_data(mock_open):
+    session = HTMLSession()
+
+    with patch.object(session, 'post') as mock_session:
+        mock_session.return_value.headers.__getitem__.return_value = "www.header@url.com"
+        header = web_control.send_image(session, "/a/dir/img.png", b"jpeg_data")
+
+    assert header == "www.header@url.com"
+    mock_open.assert_not_called()                                                       # Test file isn't read
+    mock_session.assert_called_once_with('http://www.google.com/searchbyimage/upload',
+                                         allow_redirects=False,
+                                         files={'encoded_image': ('/a/dir/img.jpg', b"jpeg_data"), 'image_content': ''})